@@ -195,6 +195,12 @@ DISABLE_LIBC_COMPATIBILITY = _env_bool_value(
 ENABLE_CYTHON_TRACING = _env_bool_value('GRPC_PYTHON_ENABLE_CYTHON_TRACING',
                                         'False')
 
+# Environment variable to determine whether or not to additionally compile the
+# pure-Python client invocation layer (grpc._channel) with Cython. The module
+# stays importable as plain Python when the extension is not built.
+ENABLE_CYTHON_SPEEDUPS = _env_bool_value('GRPC_PYTHON_ENABLE_CYTHON_SPEEDUPS',
+                                         'False')
+
 # Environment variable specifying whether or not there's interest in setting up
 # documentation building.
 ENABLE_DOCUMENTATION_BUILD = _env_bool_value(
@@ -477,6 +483,39 @@ def cython_extensions_and_necessity():
 
 CYTHON_EXTENSION_MODULES, need_cython = cython_extensions_and_necessity()
 
+# Pure-Python modules that are compiled with Cython on request. An extension
+# module takes precedence over a .py file of the same name on import.
+CYTHON_SPEEDUP_MODULE_NAMES = ('grpc._channel',)
+
+
+def cython_speedup_extensions():
+    if not ENABLE_CYTHON_SPEEDUPS:
+        return []
+    try:
+        # Break import style to ensure we have access to Cython post-setup_requires
+        import Cython.Build
+    except ImportError:
+        sys.stderr.write(
+            "You requested Cython speedups via "
+            "GRPC_PYTHON_ENABLE_CYTHON_SPEEDUPS, but do not have Cython "
+            "installed. Falling back to the pure-Python modules.\n")
+        return []
+    extensions = [
+        _extension.Extension(
+            name=module_name,
+            sources=[
+                os.path.join(PYTHON_STEM,
+                             module_name.replace('.', '/') + '.py')
+            ],
+        ) for module_name in CYTHON_SPEEDUP_MODULE_NAMES
+    ]
+    return Cython.Build.cythonize(
+        extensions, compiler_directives={'language_level': 3})
+
+
+CYTHON_EXTENSION_MODULES = (list(CYTHON_EXTENSION_MODULES) +
+                            cython_speedup_extensions())
+
 PACKAGE_DIRECTORIES = {
     '': PYTHON_STEM,
 }
@@ -13,15 +13,21 @@
 # limitations under the License.
 """Invocation-side implementation of gRPC Python."""
 
-import copy
+import atexit
+import collections
 import functools
+import itertools
 import logging
+import operator
 import os
+import queue
+import sched
+import socket
 import sys
 import threading
 import time
 from abc import abstractmethod
-from socket import getaddrinfo as gai
+from concurrent import futures
 from threading import Event
 from typing import List
 
@@ -43,49 +49,79 @@ _EMPTY_FLAGS = 0
 _DEFAULT_SINGLE_THREADED_UNARY_STREAM = os.getenv(
     "GRPC_SINGLE_THREADED_UNARY_STREAM") is not None
 
-_UNARY_UNARY_INITIAL_DUE = (
-    cygrpc.OperationType.send_initial_metadata,
-    cygrpc.OperationType.send_message,
-    cygrpc.OperationType.send_close_from_client,
-    cygrpc.OperationType.receive_initial_metadata,
-    cygrpc.OperationType.receive_message,
-    cygrpc.OperationType.receive_status_on_client,
-)
-_UNARY_STREAM_INITIAL_DUE = (
-    cygrpc.OperationType.send_initial_metadata,
-    cygrpc.OperationType.send_message,
-    cygrpc.OperationType.send_close_from_client,
-    cygrpc.OperationType.receive_initial_metadata,
-    cygrpc.OperationType.receive_status_on_client,
-)
-_STREAM_UNARY_INITIAL_DUE = (
-    cygrpc.OperationType.send_initial_metadata,
-    cygrpc.OperationType.receive_initial_metadata,
-    cygrpc.OperationType.receive_message,
-    cygrpc.OperationType.receive_status_on_client,
-)
-_STREAM_STREAM_INITIAL_DUE = (
-    cygrpc.OperationType.send_initial_metadata,
-    cygrpc.OperationType.receive_initial_metadata,
-    cygrpc.OperationType.receive_status_on_client,
-)
+
+def _default_channel_pool_size():
+    # NOTE: No guarantees are given about the maintenance of this environment
+    # variable.
+    value = os.getenv("GRPC_PYTHON_CHANNEL_POOL_SIZE", "1")
+    try:
+        return int(value)
+    except ValueError:
+        _LOGGER.warning(
+            "Ignoring malformed GRPC_PYTHON_CHANNEL_POOL_SIZE value %r; "
+            "defaulting to a single channel.", value)
+        return 1
+
+
+_DEFAULT_CHANNEL_POOL_SIZE = _default_channel_pool_size()
+
+# Fork support is decided once, when cygrpc is imported. Without it the fork
+# epoch never advances, so there is no need to consult it per RPC.
+_FORK_SUPPORT_ENABLED = cygrpc.is_fork_support_enabled()
+
+# How long Channel.__del__ waits for the connectivity lock before giving up
+# on unsubscribing.
+_DEL_UNSUBSCRIBE_TIMEOUT_S = 0.1
+
+# How long the connectivity delivery worker waits for a job before checking
+# whether a fork is in progress, when fork support is enabled.
+_DELIVERY_WORKER_POLL_PERIOD_S = 1.0
+
+# Bits of the _RPCState.due bitmask, one per cygrpc.OperationType.
+_DUE_SEND_INITIAL_METADATA = 1 << cygrpc.OperationType.send_initial_metadata
+_DUE_SEND_MESSAGE = 1 << cygrpc.OperationType.send_message
+_DUE_SEND_CLOSE_FROM_CLIENT = 1 << cygrpc.OperationType.send_close_from_client
+_DUE_RECEIVE_INITIAL_METADATA = (
+    1 << cygrpc.OperationType.receive_initial_metadata)
+_DUE_RECEIVE_MESSAGE = 1 << cygrpc.OperationType.receive_message
+_DUE_RECEIVE_STATUS_ON_CLIENT = (
+    1 << cygrpc.OperationType.receive_status_on_client)
+
+_UNARY_UNARY_INITIAL_DUE = (_DUE_SEND_INITIAL_METADATA | _DUE_SEND_MESSAGE |
+                            _DUE_SEND_CLOSE_FROM_CLIENT |
+                            _DUE_RECEIVE_INITIAL_METADATA |
+                            _DUE_RECEIVE_MESSAGE |
+                            _DUE_RECEIVE_STATUS_ON_CLIENT)
+_UNARY_STREAM_INITIAL_DUE = (_DUE_SEND_INITIAL_METADATA | _DUE_SEND_MESSAGE |
+                             _DUE_SEND_CLOSE_FROM_CLIENT |
+                             _DUE_RECEIVE_INITIAL_METADATA |
+                             _DUE_RECEIVE_STATUS_ON_CLIENT)
+_STREAM_UNARY_INITIAL_DUE = (_DUE_SEND_INITIAL_METADATA |
+                             _DUE_RECEIVE_INITIAL_METADATA |
+                             _DUE_RECEIVE_MESSAGE |
+                             _DUE_RECEIVE_STATUS_ON_CLIENT)
+_STREAM_STREAM_INITIAL_DUE = (_DUE_SEND_INITIAL_METADATA |
+                              _DUE_RECEIVE_INITIAL_METADATA |
+                              _DUE_RECEIVE_STATUS_ON_CLIENT)
+
+# SendCloseFromClientOperation carries nothing but its flags, so one instance
+# can be shared by every call. The receive operations hold the received data
+# and must not be shared.
+_SEND_CLOSE_FROM_CLIENT_OPERATION = cygrpc.SendCloseFromClientOperation(
+    _EMPTY_FLAGS)
+
+# Sentinels returned in place of a request when the user's request iterator is
+# exhausted or raises.
+_END_OF_REQUESTS = object()
+_REQUEST_ITERATION_FAILED = object()
 
 _CHANNEL_SUBSCRIPTION_CALLBACK_ERROR_LOG_MESSAGE = (
     'Exception calling channel subscription callback!')
 
-_OK_RENDEZVOUS_REPR_FORMAT = ('<{} of RPC that terminated with:\n'
-                              '\tstatus = {}\n'
-                              '\tdetails = "{}"\n'
-                              '>')
-
-_NON_OK_RENDEZVOUS_REPR_FORMAT = ('<{} of RPC that terminated with:\n'
-                                  '\tstatus = {}\n'
-                                  '\tdetails = "{}"\n'
-                                  '\tdebug_error_string = "{}"\n'
-                                  '>')
-
 
 def _deadline(timeout):
+    # Core interprets call deadlines against the realtime clock, so this must
+    # remain time.time() rather than time.monotonic().
     return None if timeout is None else time.time() + timeout
 
 
@@ -95,19 +131,21 @@ def _unknown_code_details(unknown_cygrpc_code, details):
 
 
 class _RPCState(object):
+    __slots__ = ('condition', 'send_condition', 'due', 'initial_metadata',
+                 'response', 'trailing_metadata', 'code', 'details',
+                 'debug_error_string', 'cancelled', 'callbacks', 'fork_epoch')
 
     def __init__(self, due, initial_metadata, trailing_metadata, code, details):
-        # `condition` guards all members of _RPCState. `notify_all` is called on
-        # `condition` when the state of the RPC has changed.
-        self.condition = threading.Condition()
+        self._init_conditions()
 
-        # The cygrpc.OperationType objects representing events due from the RPC's
-        # completion queue. If an operation is in `due`, it is guaranteed that
+        # A bitmask of the cygrpc.OperationType values representing events due
+        # from the RPC's completion queue, with bit `1 << operation_type` set
+        # for each. If an operation is in `due`, it is guaranteed that
         # `operate()` has been called on a corresponding operation. But the
         # converse is not true. That is, in the case of failed `operate()`
         # calls, there may briefly be events in `due` that do not correspond to
         # operations submitted to Core.
-        self.due = set(due)
+        self.due = due
         self.initial_metadata = initial_metadata
         self.response = None
         self.trailing_metadata = trailing_metadata
@@ -120,73 +158,139 @@ class _RPCState(object):
         # result of the RPC. This field tracks whether cancellation was requested
         # prior to termination of the RPC.
         self.cancelled = False
+        # (callback, argument) pairs; a callback is invoked with its argument
+        # unless the argument is None, in which case it takes no arguments.
         self.callbacks = []
-        self.fork_epoch = cygrpc.get_fork_epoch()
+        self.fork_epoch = (cygrpc.get_fork_epoch()
+                           if _FORK_SUPPORT_ENABLED else 0)
+
+    def _init_conditions(self):
+        # `condition` guards all members of _RPCState. `notify_all` is called on
+        # `condition` when the state of the RPC has changed. `send_condition`
+        # shares its lock and is notified only when an outstanding
+        # send_message operation may have completed, so that the request
+        # consumption thread is not woken by every received message.
+        lock = threading.RLock()
+        self.condition = threading.Condition(lock)
+        self.send_condition = threading.Condition(lock)
 
     def reset_postfork_child(self):
-        self.condition = threading.Condition()
+        self._init_conditions()
 
 
 def _abort(state, code, details):
     if state.code is None:
-        state.code = code
         state.details = details
         if state.initial_metadata is None:
             state.initial_metadata = ()
         state.trailing_metadata = ()
+        # Assigned last so that readers that observe a code without holding
+        # the condition also observe the rest of the terminal state.
+        state.code = code
+
+
+def _apply_receive_initial_metadata(batch_operation, state,
+                                    unused_response_deserializer,
+                                    unused_callbacks):
+    state.initial_metadata = batch_operation.initial_metadata()
+
+
+def _apply_receive_message(batch_operation, state, response_deserializer,
+                           unused_callbacks):
+    serialized_response = batch_operation.message()
+    if serialized_response is not None:
+        # Inlined _common.deserialize; this runs once per message.
+        if response_deserializer is None:
+            response = serialized_response
+        else:
+            try:
+                response = response_deserializer(serialized_response)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Exception deserializing message!')
+                response = None
+        if response is None:
+            details = 'Exception deserializing response!'
+            _abort(state, grpc.StatusCode.INTERNAL, details)
+        else:
+            state.response = response
+
+
+def _apply_receive_status_on_client(batch_operation, state,
+                                    unused_response_deserializer, callbacks):
+    state.trailing_metadata = batch_operation.trailing_metadata()
+    if state.code is None:
+        code = _common.CYGRPC_STATUS_CODE_TO_STATUS_CODE.get(
+            batch_operation.code())
+        if code is None:
+            state.details = _unknown_code_details(code,
+                                                  batch_operation.details())
+            state.code = grpc.StatusCode.UNKNOWN
+        else:
+            state.details = batch_operation.details()
+            state.debug_error_string = batch_operation.error_string()
+            state.code = code
+    callbacks.extend(state.callbacks)
+    state.callbacks = None
+
+
+# Send operations complete without updating anything but state.due.
+_RECEIVE_OPERATION_APPLIERS = {
+    cygrpc.OperationType.receive_initial_metadata:
+        _apply_receive_initial_metadata,
+    cygrpc.OperationType.receive_message:
+        _apply_receive_message,
+    cygrpc.OperationType.receive_status_on_client:
+        _apply_receive_status_on_client,
+}
 
 
 def _handle_event(event, state, response_deserializer):
     callbacks = []
+    mask = 0
     for batch_operation in event.batch_operations:
         operation_type = batch_operation.type()
-        state.due.remove(operation_type)
-        if operation_type == cygrpc.OperationType.receive_initial_metadata:
-            state.initial_metadata = batch_operation.initial_metadata()
-        elif operation_type == cygrpc.OperationType.receive_message:
-            serialized_response = batch_operation.message()
-            if serialized_response is not None:
-                response = _common.deserialize(serialized_response,
-                                               response_deserializer)
-                if response is None:
-                    details = 'Exception deserializing response!'
-                    _abort(state, grpc.StatusCode.INTERNAL, details)
-                else:
-                    state.response = response
-        elif operation_type == cygrpc.OperationType.receive_status_on_client:
-            state.trailing_metadata = batch_operation.trailing_metadata()
-            if state.code is None:
-                code = _common.CYGRPC_STATUS_CODE_TO_STATUS_CODE.get(
-                    batch_operation.code())
-                if code is None:
-                    state.code = grpc.StatusCode.UNKNOWN
-                    state.details = _unknown_code_details(
-                        code, batch_operation.details())
-                else:
-                    state.code = code
-                    state.details = batch_operation.details()
-                    state.debug_error_string = batch_operation.error_string()
-            callbacks.extend(state.callbacks)
-            state.callbacks = None
+        mask |= 1 << operation_type
+        apply = _RECEIVE_OPERATION_APPLIERS.get(operation_type)
+        if apply is not None:
+            apply(batch_operation, state, response_deserializer, callbacks)
+    # due is updated once per event rather than once per operation.
+    state.due &= ~mask
     return callbacks
 
 
+def _notify_state_changed(state):
+    """Wakes the threads waiting on an RPC's state.
+
+    Must be called with state.condition held. The request consumption thread
+    waits on state.send_condition and is woken only once the RPC has ended or
+    no send_message operation is outstanding.
+    """
+    state.condition.notify_all()
+    if state.code is not None or not state.due & _DUE_SEND_MESSAGE:
+        state.send_condition.notify()
+
+
 def _event_handler(state, response_deserializer):
 
     def handle_event(event):
         with state.condition:
             callbacks = _handle_event(event, state, response_deserializer)
-            state.condition.notify_all()
-            done = not state.due
-        for callback in callbacks:
+            _notify_state_changed(state)
+            done = state.due == 0
+        for callback, argument in callbacks:
             try:
-                callback()
+                if argument is None:
+                    callback()
+                else:
+                    callback(argument)
             except Exception as e:  # pylint: disable=broad-except
                 # NOTE(rbellevi): We suppress but log errors here so as not to
                 # kill the channel spin thread.
-                logging.error('Exception in callback %s: %s',
-                              repr(callback.func), repr(e))
-        return done and state.fork_epoch >= cygrpc.get_fork_epoch()
+                logging.error('Exception in callback %s: %s', repr(callback),
+                              repr(e))
+        if _FORK_SUPPORT_ENABLED:
+            return done and state.fork_epoch >= cygrpc.get_fork_epoch()
+        return done
 
     return handle_event
 
@@ -196,73 +300,134 @@ def _consume_request_iterator(request_iterator, state, call, request_serializer,
                               event_handler):
     """Consume a request iterator supplied by the user."""
 
+    def next_request():
+        """Pulls the next request from the user's iterator.
+
+        Returns:
+          The next request, _END_OF_REQUESTS if the iterator is exhausted, or
+          _REQUEST_ITERATION_FAILED if the iterator raised (in which case the
+          RPC has already been aborted).
+        """
+        return_from_user_request_generator_invoked = False
+        try:
+            # The thread may die in user-code. Do not block fork for this.
+            cygrpc.enter_user_request_generator()
+            return next(request_iterator)
+        except StopIteration:
+            return _END_OF_REQUESTS
+        except Exception:  # pylint: disable=broad-except
+            cygrpc.return_from_user_request_generator()
+            return_from_user_request_generator_invoked = True
+            code = grpc.StatusCode.UNKNOWN
+            details = 'Exception iterating requests!'
+            _LOGGER.exception(details)
+            call.cancel(_common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[code],
+                        details)
+            _abort(state, code, details)
+            return _REQUEST_ITERATION_FAILED
+        finally:
+            if not return_from_user_request_generator_invoked:
+                cygrpc.return_from_user_request_generator()
+
+    def requests_exhausted():
+        """Whether the user's iterator reports that it holds no more requests.
+
+        A failing __length_hint__ is treated the same as an unknown length.
+        """
+        try:
+            # The thread may die in user-code. Do not block fork for this.
+            cygrpc.enter_user_request_generator()
+            return operator.length_hint(request_iterator, -1) == 0
+        except Exception:  # pylint: disable=broad-except
+            return False
+        finally:
+            cygrpc.return_from_user_request_generator()
+
+    def send_message_done():
+        return state.code is not None or not state.due & _DUE_SEND_MESSAGE
+
+    # Built once rather than on every wait for a send to complete.
+    block_if_fork_in_progress = functools.partial(
+        cygrpc.block_if_fork_in_progress, state)
+
+    def await_send_message():
+        # Core permits only one outstanding send_message operation per call.
+        # The next request is pulled and serialized while the previous one is
+        # in flight and only then do we wait for the send to complete.
+        _common.wait(state.send_condition.wait,
+                     send_message_done,
+                     spin_cb=block_if_fork_in_progress)
+
     def consume_request_iterator():  # pylint: disable=too-many-branches
         # Iterate over the request iterator until it is exhausted or an error
         # condition is encountered.
-        while True:
-            return_from_user_request_generator_invoked = False
-            try:
-                # The thread may die in user-code. Do not block fork for this.
-                cygrpc.enter_user_request_generator()
-                request = next(request_iterator)
-            except StopIteration:
-                break
-            except Exception:  # pylint: disable=broad-except
-                cygrpc.return_from_user_request_generator()
-                return_from_user_request_generator_invoked = True
-                code = grpc.StatusCode.UNKNOWN
-                details = 'Exception iterating requests!'
-                _LOGGER.exception(details)
-                call.cancel(_common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[code],
-                            details)
-                _abort(state, code, details)
+        request = next_request()
+        while request is not _END_OF_REQUESTS:
+            if request is _REQUEST_ITERATION_FAILED:
                 return
-            finally:
-                if not return_from_user_request_generator_invoked:
-                    cygrpc.return_from_user_request_generator()
-            serialized_request = _common.serialize(request, request_serializer)
+            # Inlined _common.serialize; this runs once per message.
+            if request_serializer is None:
+                serialized_request = request
+            else:
+                try:
+                    serialized_request = request_serializer(request)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception('Exception serializing message!')
+                    serialized_request = None
+            # NOTE: Only peek at the following request when the iterator
+            # reports that it is exhausted (e.g. an iterator over a list).
+            # Peeking at an arbitrary generator could block the current
+            # message on the production of the next one, which deadlocks
+            # ping-pong style bidirectional streams.
+            peeked = requests_exhausted()
+            if peeked:
+                following_request = next_request()
+                if following_request is _REQUEST_ITERATION_FAILED:
+                    return
+            final = peeked and following_request is _END_OF_REQUESTS
             with state.condition:
-                if state.code is None and not state.cancelled:
-                    if serialized_request is None:
-                        code = grpc.StatusCode.INTERNAL
-                        details = 'Exception serializing request!'
-                        call.cancel(
-                            _common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[code],
-                            details)
-                        _abort(state, code, details)
-                        return
-                    else:
-                        state.due.add(cygrpc.OperationType.send_message)
-                        operations = (cygrpc.SendMessageOperation(
-                            serialized_request, _EMPTY_FLAGS),)
-                        operating = call.operate(operations, event_handler)
-                        if not operating:
-                            state.due.remove(cygrpc.OperationType.send_message)
-                            return
-
-                        def _done():
-                            return (state.code is not None or
-                                    cygrpc.OperationType.send_message
-                                    not in state.due)
-
-                        _common.wait(state.condition.wait,
-                                     _done,
-                                     spin_cb=functools.partial(
-                                         cygrpc.block_if_fork_in_progress,
-                                         state))
-                        if state.code is not None:
-                            return
-                else:
+                if state.code is not None or state.cancelled:
+                    return
+                if serialized_request is None:
+                    code = grpc.StatusCode.INTERNAL
+                    details = 'Exception serializing request!'
+                    call.cancel(_common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[code],
+                                details)
+                    _abort(state, code, details)
+                    return
+                await_send_message()
+                if state.code is not None:
                     return
+                if final:
+                    # The last message and the half-close share a batch,
+                    # saving a completion queue round trip.
+                    state.due |= _DUE_SEND_MESSAGE | _DUE_SEND_CLOSE_FROM_CLIENT
+                    operations = (
+                        cygrpc.SendMessageOperation(serialized_request,
+                                                    _EMPTY_FLAGS),
+                        _SEND_CLOSE_FROM_CLIENT_OPERATION,
+                    )
+                    operating = call.operate(operations, event_handler)
+                    if not operating:
+                        state.due &= ~(_DUE_SEND_MESSAGE |
+                                       _DUE_SEND_CLOSE_FROM_CLIENT)
+                    return
+                state.due |= _DUE_SEND_MESSAGE
+                operations = (cygrpc.SendMessageOperation(
+                    serialized_request, _EMPTY_FLAGS),)
+                operating = call.operate(operations, event_handler)
+                if not operating:
+                    state.due &= ~_DUE_SEND_MESSAGE
+                    return
+            request = following_request if peeked else next_request()
         with state.condition:
+            await_send_message()
             if state.code is None:
-                state.due.add(cygrpc.OperationType.send_close_from_client)
-                operations = (
-                    cygrpc.SendCloseFromClientOperation(_EMPTY_FLAGS),)
+                state.due |= _DUE_SEND_CLOSE_FROM_CLIENT
+                operations = (_SEND_CLOSE_FROM_CLIENT_OPERATION,)
                 operating = call.operate(operations, event_handler)
                 if not operating:
-                    state.due.remove(
-                        cygrpc.OperationType.send_close_from_client)
+                    state.due &= ~_DUE_SEND_CLOSE_FROM_CLIENT
 
     consumption_thread = cygrpc.ForkManagedThread(
         target=consume_request_iterator)
@@ -272,16 +437,22 @@ def _consume_request_iterator(request_iterator, state, call, request_serializer,
 
 def _rpc_state_string(class_name, rpc_state):
     """Calculates error string for RPC."""
-    with rpc_state.condition:
-        if rpc_state.code is None:
-            return '<{} object>'.format(class_name)
-        elif rpc_state.code is grpc.StatusCode.OK:
-            return _OK_RENDEZVOUS_REPR_FORMAT.format(class_name, rpc_state.code,
-                                                     rpc_state.details)
-        else:
-            return _NON_OK_RENDEZVOUS_REPR_FORMAT.format(
-                class_name, rpc_state.code, rpc_state.details,
-                rpc_state.debug_error_string)
+    # The code is assigned after the rest of the terminal state and never
+    # changes afterwards, so no lock is needed to read a consistent snapshot.
+    code = rpc_state.code
+    if code is None:
+        return f'<{class_name} object>'
+    elif code is grpc.StatusCode.OK:
+        return (f'<{class_name} of RPC that terminated with:\n'
+                f'\tstatus = {code}\n'
+                f'\tdetails = "{rpc_state.details}"\n'
+                '>')
+    else:
+        return (f'<{class_name} of RPC that terminated with:\n'
+                f'\tstatus = {code}\n'
+                f'\tdetails = "{rpc_state.details}"\n'
+                f'\tdebug_error_string = "{rpc_state.debug_error_string}"\n'
+                '>')
 
 
 class _InactiveRpcError(grpc.RpcError, grpc.Call, grpc.Future):
@@ -293,14 +464,18 @@ class _InactiveRpcError(grpc.RpcError, grpc.Call, grpc.Future):
     Attributes:
       _state: An instance of _RPCState.
     """
+    __slots__ = ('_state',)
 
     def __init__(self, state):
         with state.condition:
-            self._state = _RPCState((), copy.deepcopy(state.initial_metadata),
-                                    copy.deepcopy(state.trailing_metadata),
-                                    state.code, copy.deepcopy(state.details))
-            self._state.response = copy.copy(state.response)
-            self._state.debug_error_string = copy.copy(state.debug_error_string)
+            # The metadata tuples handed out by cygrpc as well as the details
+            # and debug error strings are immutable, so they are shared rather
+            # than copied. The response is not carried over at all: result()
+            # always raises, so nothing reads it.
+            self._state = _RPCState(0, state.initial_metadata,
+                                    state.trailing_metadata, state.code,
+                                    state.details)
+            self._state.debug_error_string = state.debug_error_string
 
     def initial_metadata(self):
         return self._state.initial_metadata
@@ -375,6 +550,7 @@ class _Rendezvous(grpc.RpcError, grpc.RpcContext):
       _deadline: A float representing the deadline of the RPC in seconds. Or
         possibly None, to represent an RPC with no deadline at all.
     """
+    __slots__ = ('_state', '_call', '_response_deserializer', '_deadline')
 
     def __init__(self, state, call, response_deserializer, deadline):
         super(_Rendezvous, self).__init__()
@@ -406,7 +582,7 @@ class _Rendezvous(grpc.RpcError, grpc.RpcContext):
                     _common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[code], details)
                 self._state.cancelled = True
                 _abort(self._state, code, details)
-                self._state.condition.notify_all()
+                _notify_state_changed(self._state)
                 return True
             else:
                 return False
@@ -417,7 +593,7 @@ class _Rendezvous(grpc.RpcError, grpc.RpcContext):
             if self._state.callbacks is None:
                 return False
             else:
-                self._state.callbacks.append(callback)
+                self._state.callbacks.append((callback, None))
                 return True
 
     def __iter__(self):
@@ -447,13 +623,13 @@ class _Rendezvous(grpc.RpcError, grpc.RpcContext):
     def __del__(self):
         with self._state.condition:
             if self._state.code is None:
-                self._state.code = grpc.StatusCode.CANCELLED
                 self._state.details = 'Cancelled upon garbage collection!'
                 self._state.cancelled = True
+                self._state.code = grpc.StatusCode.CANCELLED
                 self._call.cancel(
                     _common.STATUS_CODE_TO_CYGRPC_STATUS_CODE[self._state.code],
                     self._state.details)
-                self._state.condition.notify_all()
+                _notify_state_changed(self._state)
 
 
 class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint: disable=too-many-ancestors
@@ -469,21 +645,25 @@ class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
     This means that these methods are safe to call from add_done_callback
     handlers.
     """
+    __slots__ = ()
 
     def _is_complete(self):
         return self._state.code is not None
 
     def cancelled(self):
-        with self._state.condition:
-            return self._state.cancelled
+        state = self._state
+        with state.condition:
+            return state.cancelled
 
     def running(self):
-        with self._state.condition:
-            return self._state.code is None
+        state = self._state
+        with state.condition:
+            return state.code is None
 
     def done(self):
-        with self._state.condition:
-            return self._state.code is not None
+        state = self._state
+        with state.condition:
+            return state.code is not None
 
     def result(self, timeout=None):
         """Returns the result of the computation or raises its exception.
@@ -495,14 +675,15 @@ class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
         be ignored.
         """
         del timeout
-        with self._state.condition:
+        state = self._state
+        with state.condition:
             if not self._is_complete():
                 raise grpc.experimental.UsageError(
                     "_SingleThreadedRendezvous only supports result() when the RPC is complete."
                 )
-            if self._state.code is grpc.StatusCode.OK:
-                return self._state.response
-            elif self._state.cancelled:
+            if state.code is grpc.StatusCode.OK:
+                return state.response
+            elif state.cancelled:
                 raise grpc.FutureCancelledError()
             else:
                 raise self
@@ -517,14 +698,15 @@ class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
         be ignored.
         """
         del timeout
-        with self._state.condition:
+        state = self._state
+        with state.condition:
             if not self._is_complete():
                 raise grpc.experimental.UsageError(
                     "_SingleThreadedRendezvous only supports exception() when the RPC is complete."
                 )
-            if self._state.code is grpc.StatusCode.OK:
+            if state.code is grpc.StatusCode.OK:
                 return None
-            elif self._state.cancelled:
+            elif state.cancelled:
                 raise grpc.FutureCancelledError()
             else:
                 return self
@@ -539,14 +721,15 @@ class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
         be ignored.
         """
         del timeout
-        with self._state.condition:
+        state = self._state
+        with state.condition:
             if not self._is_complete():
                 raise grpc.experimental.UsageError(
                     "_SingleThreadedRendezvous only supports traceback() when the RPC is complete."
                 )
-            if self._state.code is grpc.StatusCode.OK:
+            if state.code is grpc.StatusCode.OK:
                 return None
-            elif self._state.cancelled:
+            elif state.cancelled:
                 raise grpc.FutureCancelledError()
             else:
                 try:
@@ -555,102 +738,126 @@ class _SingleThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
                     return sys.exc_info()[2]
 
     def add_done_callback(self, fn):
-        with self._state.condition:
-            if self._state.code is None:
-                self._state.callbacks.append(functools.partial(fn, self))
+        state = self._state
+        with state.condition:
+            if state.code is None:
+                state.callbacks.append((fn, self))
                 return
 
         fn(self)
 
     def initial_metadata(self):
         """See grpc.Call.initial_metadata"""
-        with self._state.condition:
+        state = self._state
+        with state.condition:
             # NOTE(gnossen): Based on our initial call batch, we are guaranteed
             # to receive initial metadata before any messages.
-            while self._state.initial_metadata is None:
+            while state.initial_metadata is None:
                 self._consume_next_event()
-            return self._state.initial_metadata
+            return state.initial_metadata
 
     def trailing_metadata(self):
         """See grpc.Call.trailing_metadata"""
-        with self._state.condition:
-            if self._state.trailing_metadata is None:
+        state = self._state
+        with state.condition:
+            if state.trailing_metadata is None:
                 raise grpc.experimental.UsageError(
                     "Cannot get trailing metadata until RPC is completed.")
-            return self._state.trailing_metadata
+            return state.trailing_metadata
 
     def code(self):
         """See grpc.Call.code"""
-        with self._state.condition:
-            if self._state.code is None:
+        state = self._state
+        with state.condition:
+            if state.code is None:
                 raise grpc.experimental.UsageError(
                     "Cannot get code until RPC is completed.")
-            return self._state.code
+            return state.code
 
     def details(self):
         """See grpc.Call.details"""
-        with self._state.condition:
-            if self._state.details is None:
+        state = self._state
+        with state.condition:
+            if state.details is None:
                 raise grpc.experimental.UsageError(
                     "Cannot get details until RPC is completed.")
-            return _common.decode(self._state.details)
+            return _common.decode(state.details)
 
     def _consume_next_event(self):
+        state = self._state
         event = self._call.next_event()
-        with self._state.condition:
-            callbacks = _handle_event(event, self._state,
-                                      self._response_deserializer)
-            for callback in callbacks:
+        with state.condition:
+            callbacks = _handle_event(event, state, self._response_deserializer)
+            for callback, argument in callbacks:
                 # NOTE(gnossen): We intentionally allow exceptions to bubble up
                 # to the user when running on a single thread.
-                callback()
+                if argument is None:
+                    callback()
+                else:
+                    callback(argument)
         return event
 
     def _next_response(self):
+        state = self._state
         while True:
-            self._consume_next_event()
-            with self._state.condition:
-                if self._state.response is not None:
-                    response = self._state.response
-                    self._state.response = None
+            event = self._call.next_event()
+            # NOTE: The event is handled and the response checked under a
+            # single acquisition of the condition. The condition cannot be
+            # dropped altogether since cancel() may be called from another
+            # thread.
+            with state.condition:
+                callbacks = _handle_event(event, state,
+                                          self._response_deserializer)
+                for callback, argument in callbacks:
+                    if argument is None:
+                        callback()
+                    else:
+                        callback(argument)
+                if state.response is not None:
+                    response = state.response
+                    state.response = None
                     return response
-                elif cygrpc.OperationType.receive_message not in self._state.due:
-                    if self._state.code is grpc.StatusCode.OK:
+                elif not state.due & _DUE_RECEIVE_MESSAGE:
+                    if state.code is grpc.StatusCode.OK:
                         raise StopIteration()
-                    elif self._state.code is not None:
+                    elif state.code is not None:
                         raise self
 
     def _next(self):
-        with self._state.condition:
-            if self._state.code is None:
+        state = self._state
+        with state.condition:
+            if state.code is None:
                 # We tentatively add the operation as expected and remove
                 # it if the enqueue operation fails. This allows us to guarantee that
                 # if an event has been submitted to the core completion queue,
                 # it is in `due`. If we waited until after a successful
                 # enqueue operation then a signal could interrupt this
                 # thread between the enqueue operation and the addition of the
-                # operation to `due`. This would cause an exception on the
-                # channel spin thread when the operation completes and no
-                # corresponding operation would be present in state.due.
+                # operation to `due`. Clearing an absent bit is harmless, but
+                # `due` would then briefly read as empty while an operation is
+                # still outstanding on the call.
                 # Note that, since `condition` is held through this block, there is
-                # no data race on `due`.
-                self._state.due.add(cygrpc.OperationType.receive_message)
+                # no data race on `due`. Holding it across `operate()` is cheap:
+                # starting a batch only enqueues it with Core, and cygrpc
+                # releases the GIL while it does so.
+                state.due |= _DUE_RECEIVE_MESSAGE
                 operating = self._call.operate(
                     (cygrpc.ReceiveMessageOperation(_EMPTY_FLAGS),), None)
                 if not operating:
-                    self._state.due.remove(cygrpc.OperationType.receive_message)
-            elif self._state.code is grpc.StatusCode.OK:
+                    state.due &= ~_DUE_RECEIVE_MESSAGE
+            elif state.code is grpc.StatusCode.OK:
                 raise StopIteration()
             else:
                 raise self
         return self._next_response()
 
     def debug_error_string(self):
-        with self._state.condition:
-            if self._state.debug_error_string is None:
+        state = self._state
+        with state.condition:
+            if state.debug_error_string is None:
                 raise grpc.experimental.UsageError(
                     "Cannot get debug error string until RPC is completed.")
-            return _common.decode(self._state.debug_error_string)
+            return _common.decode(state.debug_error_string)
 
 
 class _MultiThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint: disable=too-many-ancestors
@@ -662,87 +869,124 @@ class _MultiThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
 
     This extra thread allows _MultiThreadedRendezvous to fulfill the grpc.Future interface
     and to mediate a bidirection streaming RPC.
+
+    Attributes:
+      _event_handler: The event handler the RPC was started with, reused for
+        the receive operations started while iterating, or None if it is to
+        be created on first use.
     """
+    __slots__ = ('_event_handler',)
+
+    def __init__(self,
+                 state,
+                 call,
+                 response_deserializer,
+                 deadline,
+                 event_handler=None):
+        super(_MultiThreadedRendezvous,
+              self).__init__(state, call, response_deserializer, deadline)
+        self._event_handler = event_handler
 
     def initial_metadata(self):
         """See grpc.Call.initial_metadata"""
-        with self._state.condition:
-
-            def _done():
-                return self._state.initial_metadata is not None
+        state = self._state
+        with state.condition:
+            _common.wait(state.condition.wait, self._has_initial_metadata)
+            return state.initial_metadata
 
-            _common.wait(self._state.condition.wait, _done)
-            return self._state.initial_metadata
+    # NOTE: The fields read by the accessors below are assigned under the
+    # state's condition and never reset to None, and a single attribute load is
+    # atomic. So once a field is observed to be set it can be returned without
+    # acquiring the condition.
 
     def trailing_metadata(self):
         """See grpc.Call.trailing_metadata"""
-        with self._state.condition:
-
-            def _done():
-                return self._state.trailing_metadata is not None
-
-            _common.wait(self._state.condition.wait, _done)
-            return self._state.trailing_metadata
+        state = self._state
+        trailing_metadata = state.trailing_metadata
+        if trailing_metadata is not None:
+            return trailing_metadata
+        with state.condition:
+            _common.wait(state.condition.wait, self._has_trailing_metadata)
+            return state.trailing_metadata
 
     def code(self):
         """See grpc.Call.code"""
-        with self._state.condition:
-
-            def _done():
-                return self._state.code is not None
-
-            _common.wait(self._state.condition.wait, _done)
-            return self._state.code
+        state = self._state
+        code = state.code
+        if code is not None:
+            return code
+        with state.condition:
+            _common.wait(state.condition.wait, self._is_complete)
+            return state.code
 
     def details(self):
         """See grpc.Call.details"""
-        with self._state.condition:
-
-            def _done():
-                return self._state.details is not None
-
-            _common.wait(self._state.condition.wait, _done)
-            return _common.decode(self._state.details)
+        state = self._state
+        details = state.details
+        if details is not None:
+            return _common.decode(details)
+        with state.condition:
+            _common.wait(state.condition.wait, self._has_details)
+            return _common.decode(state.details)
 
     def debug_error_string(self):
-        with self._state.condition:
-
-            def _done():
-                return self._state.debug_error_string is not None
-
-            _common.wait(self._state.condition.wait, _done)
-            return _common.decode(self._state.debug_error_string)
+        state = self._state
+        debug_error_string = state.debug_error_string
+        if debug_error_string is not None:
+            return _common.decode(debug_error_string)
+        with state.condition:
+            _common.wait(state.condition.wait, self._has_debug_error_string)
+            return _common.decode(state.debug_error_string)
 
     def cancelled(self):
-        with self._state.condition:
-            return self._state.cancelled
+        return self._state.cancelled
 
     def running(self):
-        with self._state.condition:
-            return self._state.code is None
+        return self._state.code is None
 
     def done(self):
-        with self._state.condition:
-            return self._state.code is not None
+        return self._state.code is not None
+
+    # The predicates below are methods rather than closures defined in the
+    # accessors that wait on them, so that no function is created per call.
 
     def _is_complete(self):
         return self._state.code is not None
 
+    def _has_initial_metadata(self):
+        return self._state.initial_metadata is not None
+
+    def _has_trailing_metadata(self):
+        return self._state.trailing_metadata is not None
+
+    def _has_details(self):
+        return self._state.details is not None
+
+    def _has_debug_error_string(self):
+        return self._state.debug_error_string is not None
+
+    def _response_ready(self):
+        state = self._state
+        return (state.response is not None or
+                (not state.due & _DUE_RECEIVE_MESSAGE and
+                 state.code is not None))
+
     def result(self, timeout=None):
         """Returns the result of the computation or raises its exception.
 
         See grpc.Future.result for the full API contract.
         """
-        with self._state.condition:
-            timed_out = _common.wait(self._state.condition.wait,
+        state = self._state
+        with state.condition:
+            timed_out = _common.wait(state.condition.wait,
                                      self._is_complete,
                                      timeout=timeout)
             if timed_out:
                 raise grpc.FutureTimeoutError()
             else:
-                if self._state.code is grpc.StatusCode.OK:
-                    return self._state.response
-                elif self._state.cancelled:
+                if state.code is grpc.StatusCode.OK:
+                    return state.response
+                elif state.cancelled:
                     raise grpc.FutureCancelledError()
                 else:
                     raise self
@@ -752,16 +996,17 @@ class _MultiThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
 
         See grpc.Future.exception for the full API contract.
         """
-        with self._state.condition:
-            timed_out = _common.wait(self._state.condition.wait,
+        state = self._state
+        with state.condition:
+            timed_out = _common.wait(state.condition.wait,
                                      self._is_complete,
                                      timeout=timeout)
             if timed_out:
                 raise grpc.FutureTimeoutError()
             else:
-                if self._state.code is grpc.StatusCode.OK:
+                if state.code is grpc.StatusCode.OK:
                     return None
-                elif self._state.cancelled:
+                elif state.cancelled:
                     raise grpc.FutureCancelledError()
                 else:
                     return self
@@ -771,16 +1016,17 @@ class _MultiThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
 
         See grpc.future.traceback for the full API contract.
         """
-        with self._state.condition:
-            timed_out = _common.wait(self._state.condition.wait,
+        state = self._state
+        with state.condition:
+            timed_out = _common.wait(state.condition.wait,
                                      self._is_complete,
                                      timeout=timeout)
             if timed_out:
                 raise grpc.FutureTimeoutError()
             else:
-                if self._state.code is grpc.StatusCode.OK:
+                if state.code is grpc.StatusCode.OK:
                     return None
-                elif self._state.cancelled:
+                elif state.cancelled:
                     raise grpc.FutureCancelledError()
                 else:
                     try:
@@ -789,57 +1035,49 @@ class _MultiThreadedRendezvous(_Rendezvous, grpc.Call, grpc.Future):  # pylint:
                         return sys.exc_info()[2]
 
     def add_done_callback(self, fn):
-        with self._state.condition:
-            if self._state.code is None:
-                self._state.callbacks.append(functools.partial(fn, self))
+        state = self._state
+        with state.condition:
+            if state.code is None:
+                state.callbacks.append((fn, self))
                 return
 
         fn(self)
 
     def _next(self):
-        with self._state.condition:
-            if self._state.code is None:
-                event_handler = _event_handler(self._state,
-                                               self._response_deserializer)
-                self._state.due.add(cygrpc.OperationType.receive_message)
+        state = self._state
+        with state.condition:
+            if state.code is None:
+                event_handler = self._event_handler
+                if event_handler is None:
+                    event_handler = _event_handler(state,
+                                                   self._response_deserializer)
+                    self._event_handler = event_handler
+                state.due |= _DUE_RECEIVE_MESSAGE
                 operating = self._call.operate(
                     (cygrpc.ReceiveMessageOperation(_EMPTY_FLAGS),),
                     event_handler)
                 if not operating:
-                    self._state.due.remove(cygrpc.OperationType.receive_message)
-            elif self._state.code is grpc.StatusCode.OK:
+                    state.due &= ~_DUE_RECEIVE_MESSAGE
+            elif state.code is grpc.StatusCode.OK:
                 raise StopIteration()
             else:
                 raise self
-
-            def _response_ready():
-                return (self._state.response is not None or
-                        (cygrpc.OperationType.receive_message
-                         not in self._state.due and
-                         self._state.code is not None))
-
-            _common.wait(self._state.condition.wait, _response_ready)
-            if self._state.response is not None:
-                response = self._state.response
-                self._state.response = None
+            _common.wait(state.condition.wait, self._response_ready)
+            if state.response is not None:
+                response = state.response
+                state.response = None
                 return response
-            elif cygrpc.OperationType.receive_message not in self._state.due:
-                if self._state.code is grpc.StatusCode.OK:
+            elif not state.due & _DUE_RECEIVE_MESSAGE:
+                if state.code is grpc.StatusCode.OK:
                     raise StopIteration()
-                elif self._state.code is not None:
+                elif state.code is not None:
                     raise self
 
 
-def _start_unary_request(request, timeout, request_serializer):
-    deadline = _deadline(timeout)
-    serialized_request = _common.serialize(request, request_serializer)
-    if serialized_request is None:
-        state = _RPCState((), (), (), grpc.StatusCode.INTERNAL,
-                          'Exception serializing request!')
-        error = _InactiveRpcError(state)
-        return deadline, None, error
-    else:
-        return deadline, serialized_request, None
+# The state of RPCs whose request could not be serialized. _InactiveRpcError
+# copies the state it is given, so this one is never mutated.
+_SERIALIZATION_ERROR_STATE = _RPCState(0, (), (), grpc.StatusCode.INTERNAL,
+                                       'Exception serializing request!')
 
 
 def _end_unary_response_blocking(state, call, with_call, deadline):
@@ -867,23 +1105,33 @@ def _stream_unary_invocation_operationses(metadata, initial_metadata_flags):
 
 def _stream_unary_invocation_operationses_and_tags(metadata,
                                                    initial_metadata_flags):
-    return tuple((
-        operations,
-        None,
-    ) for operations in _stream_unary_invocation_operationses(
-        metadata, initial_metadata_flags))
+    return (
+        (
+            (
+                cygrpc.SendInitialMetadataOperation(metadata,
+                                                    initial_metadata_flags),
+                cygrpc.ReceiveMessageOperation(_EMPTY_FLAGS),
+                cygrpc.ReceiveStatusOnClientOperation(_EMPTY_FLAGS),
+            ),
+            None,
+        ),
+        (
+            (cygrpc.ReceiveInitialMetadataOperation(_EMPTY_FLAGS),),
+            None,
+        ),
+    )
 
 
 def _determine_deadline(user_deadline):
     parent_deadline = cygrpc.get_deadline_from_context()
-    if parent_deadline is None and user_deadline is None:
-        return None
-    elif parent_deadline is not None and user_deadline is None:
-        return parent_deadline
-    elif user_deadline is not None and parent_deadline is None:
+    # Outside of a server handler there is no parent deadline, so test for
+    # that first.
+    if parent_deadline is None:
         return user_deadline
+    elif user_deadline is None or parent_deadline < user_deadline:
+        return parent_deadline
     else:
-        return min(parent_deadline, user_deadline)
+        return user_deadline
 
 
 class _UnaryUnaryMultiCallable(grpc.UnaryUnaryMultiCallable):
@@ -899,21 +1147,23 @@ class _UnaryUnaryMultiCallable(grpc.UnaryUnaryMultiCallable):
         self._context = cygrpc.build_census_context()
 
     def _prepare(self, request, timeout, metadata, wait_for_ready, compression):
-        deadline, serialized_request, rendezvous = _start_unary_request(
-            request, timeout, self._request_serializer)
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
-        augmented_metadata = _compression.augment_metadata(
-            metadata, compression)
+        deadline = _deadline(timeout)
+        serialized_request = _common.serialize(request,
+                                               self._request_serializer)
         if serialized_request is None:
-            return None, None, None, rendezvous
+            return None, None, None, _InactiveRpcError(
+                _SERIALIZATION_ERROR_STATE)
         else:
+            initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+            augmented_metadata = (metadata if compression is None else
+                                  _compression.augment_metadata(
+                                      metadata, compression))
             state = _RPCState(_UNARY_UNARY_INITIAL_DUE, None, None, None, None)
             operations = (
                 cygrpc.SendInitialMetadataOperation(augmented_metadata,
                                                     initial_metadata_flags),
                 cygrpc.SendMessageOperation(serialized_request, _EMPTY_FLAGS),
-                cygrpc.SendCloseFromClientOperation(_EMPTY_FLAGS),
+                _SEND_CLOSE_FROM_CLIENT_OPERATION,
                 cygrpc.ReceiveInitialMetadataOperation(_EMPTY_FLAGS),
                 cygrpc.ReceiveMessageOperation(_EMPTY_FLAGS),
                 cygrpc.ReceiveStatusOnClientOperation(_EMPTY_FLAGS),
@@ -980,7 +1230,7 @@ class _UnaryUnaryMultiCallable(grpc.UnaryUnaryMultiCallable):
                 (operations,), event_handler, self._context)
             return _MultiThreadedRendezvous(state, call,
                                             self._response_deserializer,
-                                            deadline)
+                                            deadline, event_handler)
 
 
 class _SingleThreadedUnaryStreamMultiCallable(grpc.UnaryStreamMultiCallable):
@@ -1006,25 +1256,22 @@ class _SingleThreadedUnaryStreamMultiCallable(grpc.UnaryStreamMultiCallable):
         serialized_request = _common.serialize(request,
                                                self._request_serializer)
         if serialized_request is None:
-            state = _RPCState((), (), (), grpc.StatusCode.INTERNAL,
-                              'Exception serializing request!')
-            raise _InactiveRpcError(state)
+            raise _InactiveRpcError(_SERIALIZATION_ERROR_STATE)
 
         state = _RPCState(_UNARY_STREAM_INITIAL_DUE, None, None, None, None)
         call_credentials = None if credentials is None else credentials._credentials
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
-        augmented_metadata = _compression.augment_metadata(
-            metadata, compression)
-        operations = (
-            (cygrpc.SendInitialMetadataOperation(augmented_metadata,
-                                                 initial_metadata_flags),
-             cygrpc.SendMessageOperation(serialized_request, _EMPTY_FLAGS),
-             cygrpc.SendCloseFromClientOperation(_EMPTY_FLAGS)),
-            (cygrpc.ReceiveStatusOnClientOperation(_EMPTY_FLAGS),),
-            (cygrpc.ReceiveInitialMetadataOperation(_EMPTY_FLAGS),),
+        initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+        augmented_metadata = (metadata if compression is None else
+                              _compression.augment_metadata(
+                                  metadata, compression))
+        operations_and_tags = (
+            ((cygrpc.SendInitialMetadataOperation(augmented_metadata,
+                                                  initial_metadata_flags),
+              cygrpc.SendMessageOperation(serialized_request, _EMPTY_FLAGS),
+              _SEND_CLOSE_FROM_CLIENT_OPERATION), None),
+            ((cygrpc.ReceiveStatusOnClientOperation(_EMPTY_FLAGS),), None),
+            ((cygrpc.ReceiveInitialMetadataOperation(_EMPTY_FLAGS),), None),
         )
-        operations_and_tags = tuple((ops, None) for ops in operations)
         call = self._channel.segregated_call(
             cygrpc.PropagationConstants.GRPC_PROPAGATE_DEFAULTS, self._method,
             None, _determine_deadline(deadline), metadata, call_credentials,
@@ -1053,15 +1300,16 @@ class _UnaryStreamMultiCallable(grpc.UnaryStreamMultiCallable):
             credentials=None,
             wait_for_ready=None,
             compression=None):
-        deadline, serialized_request, rendezvous = _start_unary_request(
-            request, timeout, self._request_serializer)
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
+        deadline = _deadline(timeout)
+        serialized_request = _common.serialize(request,
+                                               self._request_serializer)
         if serialized_request is None:
-            raise rendezvous  # pylint: disable-msg=raising-bad-type
+            raise _InactiveRpcError(_SERIALIZATION_ERROR_STATE)
         else:
-            augmented_metadata = _compression.augment_metadata(
-                metadata, compression)
+            initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+            augmented_metadata = (metadata if compression is None else
+                                  _compression.augment_metadata(
+                                      metadata, compression))
             state = _RPCState(_UNARY_STREAM_INITIAL_DUE, None, None, None, None)
             operationses = (
                 (
@@ -1069,21 +1317,20 @@ class _UnaryStreamMultiCallable(grpc.UnaryStreamMultiCallable):
                                                         initial_metadata_flags),
                     cygrpc.SendMessageOperation(serialized_request,
                                                 _EMPTY_FLAGS),
-                    cygrpc.SendCloseFromClientOperation(_EMPTY_FLAGS),
+                    _SEND_CLOSE_FROM_CLIENT_OPERATION,
                     cygrpc.ReceiveStatusOnClientOperation(_EMPTY_FLAGS),
                 ),
                 (cygrpc.ReceiveInitialMetadataOperation(_EMPTY_FLAGS),),
             )
+            event_handler = _event_handler(state, self._response_deserializer)
             call = self._managed_call(
                 cygrpc.PropagationConstants.GRPC_PROPAGATE_DEFAULTS,
                 self._method, None, _determine_deadline(deadline), metadata,
                 None if credentials is None else credentials._credentials,
-                operationses, _event_handler(state,
-                                             self._response_deserializer),
-                self._context)
+                operationses, event_handler, self._context)
             return _MultiThreadedRendezvous(state, call,
                                             self._response_deserializer,
-                                            deadline)
+                                            deadline, event_handler)
 
 
 class _StreamUnaryMultiCallable(grpc.StreamUnaryMultiCallable):
@@ -1102,10 +1349,10 @@ class _StreamUnaryMultiCallable(grpc.StreamUnaryMultiCallable):
                   wait_for_ready, compression):
         deadline = _deadline(timeout)
         state = _RPCState(_STREAM_UNARY_INITIAL_DUE, None, None, None, None)
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
-        augmented_metadata = _compression.augment_metadata(
-            metadata, compression)
+        initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+        augmented_metadata = (metadata if compression is None else
+                              _compression.augment_metadata(
+                                  metadata, compression))
         call = self._channel.segregated_call(
             cygrpc.PropagationConstants.GRPC_PROPAGATE_DEFAULTS, self._method,
             None, _determine_deadline(deadline), augmented_metadata,
@@ -1118,8 +1365,8 @@ class _StreamUnaryMultiCallable(grpc.StreamUnaryMultiCallable):
             event = call.next_event()
             with state.condition:
                 _handle_event(event, state, self._response_deserializer)
-                state.condition.notify_all()
-                if not state.due:
+                _notify_state_changed(state)
+                if state.due == 0:
                     break
         return state, call
 
@@ -1155,10 +1402,10 @@ class _StreamUnaryMultiCallable(grpc.StreamUnaryMultiCallable):
         deadline = _deadline(timeout)
         state = _RPCState(_STREAM_UNARY_INITIAL_DUE, None, None, None, None)
         event_handler = _event_handler(state, self._response_deserializer)
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
-        augmented_metadata = _compression.augment_metadata(
-            metadata, compression)
+        initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+        augmented_metadata = (metadata if compression is None else
+                              _compression.augment_metadata(
+                                  metadata, compression))
         call = self._managed_call(
             cygrpc.PropagationConstants.GRPC_PROPAGATE_DEFAULTS, self._method,
             None, deadline, augmented_metadata,
@@ -1169,7 +1416,8 @@ class _StreamUnaryMultiCallable(grpc.StreamUnaryMultiCallable):
         _consume_request_iterator(request_iterator, state, call,
                                   self._request_serializer, event_handler)
         return _MultiThreadedRendezvous(state, call,
-                                        self._response_deserializer, deadline)
+                                        self._response_deserializer, deadline,
+                                        event_handler)
 
 
 class _StreamStreamMultiCallable(grpc.StreamStreamMultiCallable):
@@ -1193,10 +1441,10 @@ class _StreamStreamMultiCallable(grpc.StreamStreamMultiCallable):
                  compression=None):
         deadline = _deadline(timeout)
         state = _RPCState(_STREAM_STREAM_INITIAL_DUE, None, None, None, None)
-        initial_metadata_flags = _InitialMetadataFlags().with_wait_for_ready(
-            wait_for_ready)
-        augmented_metadata = _compression.augment_metadata(
-            metadata, compression)
+        initial_metadata_flags = _initial_metadata_flags(wait_for_ready)
+        augmented_metadata = (metadata if compression is None else
+                              _compression.augment_metadata(
+                                  metadata, compression))
         operationses = (
             (
                 cygrpc.SendInitialMetadataOperation(augmented_metadata,
@@ -1214,7 +1462,8 @@ class _StreamStreamMultiCallable(grpc.StreamStreamMultiCallable):
         _consume_request_iterator(request_iterator, state, call,
                                   self._request_serializer, event_handler)
         return _MultiThreadedRendezvous(state, call,
-                                        self._response_deserializer, deadline)
+                                        self._response_deserializer, deadline,
+                                        event_handler)
 
 
 class _InitialMetadataFlags(int):
@@ -1235,6 +1484,23 @@ class _InitialMetadataFlags(int):
         return self
 
 
+# There are only three possible flag values for a call, so they are built once.
+_DEFAULT_INITIAL_METADATA_FLAGS = _InitialMetadataFlags()
+_WAIT_FOR_READY_INITIAL_METADATA_FLAGS = (
+    _DEFAULT_INITIAL_METADATA_FLAGS.with_wait_for_ready(True))
+_FAIL_FAST_INITIAL_METADATA_FLAGS = (
+    _DEFAULT_INITIAL_METADATA_FLAGS.with_wait_for_ready(False))
+
+
+def _initial_metadata_flags(wait_for_ready):
+    if wait_for_ready is None:
+        return _DEFAULT_INITIAL_METADATA_FLAGS
+    elif wait_for_ready:
+        return _WAIT_FOR_READY_INITIAL_METADATA_FLAGS
+    else:
+        return _FAIL_FAST_INITIAL_METADATA_FLAGS
+
+
 class _ChannelCallState(object):
 
     def __init__(self, channel):
@@ -1259,6 +1525,9 @@ def _run_channel_spin_thread(state):
     def channel_spin():
         while True:
             cygrpc.block_if_fork_in_progress(state)
+            # NOTE: next_call_event blocks until an event arrives unless fork
+            # support is enabled. In that case it times out every second so
+            # that this thread can park itself in block_if_fork_in_progress.
             event = state.channel.next_call_event()
             if event.completion_type == cygrpc.CompletionType.queue_timeout:
                 continue
@@ -1297,50 +1566,126 @@ def _channel_managed_call_management(state):
         Returns:
           A cygrpc.IntegratedCall with which to conduct an RPC.
         """
-        operationses_and_tags = tuple((
-            operations,
-            event_handler,
-        ) for operations in operationses)
+        # A list comprehension avoids the generator frame of tuple(genexpr);
+        # cygrpc only iterates over the pairs.
+        operationses_and_tags = [
+            (operations, event_handler) for operations in operationses
+        ]
+        # The call is started outside of the lock so that concurrent call
+        # starts do not serialize on it. Should the spin thread exit in the
+        # meantime, the count below drops to zero and a new spin thread is
+        # started for the new call. Should the call complete first, the spin
+        # thread at worst exits early and the count restarts one.
+        call = state.channel.integrated_call(flags, method, host, deadline,
+                                             metadata, credentials,
+                                             operationses_and_tags, context)
         with state.lock:
-            call = state.channel.integrated_call(flags, method, host, deadline,
-                                                 metadata, credentials,
-                                                 operationses_and_tags, context)
             if state.managed_calls == 0:
                 state.managed_calls = 1
                 _run_channel_spin_thread(state)
             else:
                 state.managed_calls += 1
-            return call
+        return call
 
     return create
 
 
+class _ChannelPool(object):
+    """A group of cygrpc.Channels across which calls are spread round-robin.
+
+    Every channel in the pool uses its own subchannel pool and therefore its
+    own connection, so concurrent RPCs do not share a single HTTP/2 stream-ID
+    space and flow-control window. Every channel also has its own completion
+    queue and spin thread.
+    """
+
+    def __init__(self, target, options, credentials, size):
+        if size < 1:
+            raise ValueError(
+                'A channel pool needs at least one channel, got {}!'.format(
+                    size))
+        options = tuple(options) + (('grpc.use_local_subchannel_pool', 1),)
+        self.channels = tuple(
+            cygrpc.Channel(target, options, credentials) for _ in range(size))
+        self._call_states = tuple(
+            _ChannelCallState(channel) for channel in self.channels)
+        self._managed_calls = tuple(
+            _channel_managed_call_management(call_state)
+            for call_state in self._call_states)
+        # next() on an itertools.count is atomic under the GIL.
+        self._counter = itertools.count()
+
+    def _next_index(self):
+        return next(self._counter) % len(self.channels)
+
+    # pylint: disable=too-many-arguments
+    def managed_call(self, flags, method, host, deadline, metadata, credentials,
+                     operationses, event_handler, context):
+        """Creates a cygrpc.IntegratedCall on the next channel of the pool."""
+        return self._managed_calls[self._next_index()](flags, method, host,
+                                                       deadline, metadata,
+                                                       credentials,
+                                                       operationses,
+                                                       event_handler, context)
+
+    # pylint: disable=too-many-arguments
+    def segregated_call(self,
+                        flags,
+                        method,
+                        host,
+                        deadline,
+                        metadata,
+                        credentials,
+                        operationses_and_tags,
+                        context=None):
+        """Creates a cygrpc.SegregatedCall on the next channel of the pool."""
+        return self.channels[self._next_index()].segregated_call(
+            flags, method, host, deadline, metadata, credentials,
+            operationses_and_tags, context)
+
+    def close(self, code, details):
+        for channel in self.channels:
+            channel.close(code, details)
+
+    def close_on_fork(self, code, details):
+        for channel in self.channels:
+            channel.close_on_fork(code, details)
+
+
 class _ChannelConnectivityState(object):
 
     def __init__(self, channel):
+        # Re-entrant because Channel.__del__ unsubscribes under this lock and
+        # may be run by the garbage collector on a thread already holding it.
         self.lock = threading.RLock()
         self.channel = channel
         self.polling = False
         self.connectivity = None
         self.try_to_connect = False
-        self.callbacks_and_connectivities = []
+        # Maps each subscribed callback to the connectivity last delivered to
+        # it, or None if nothing has been delivered yet.
+        self.callbacks_and_connectivities = {}
         self.delivering = False
+        # Feeds the long-lived delivery worker, or None if there is none.
+        self.delivery_queue = None
 
     def reset_postfork_child(self):
         self.polling = False
         self.connectivity = None
         self.try_to_connect = False
-        self.callbacks_and_connectivities = []
+        self.callbacks_and_connectivities = {}
         self.delivering = False
+        self.delivery_queue = None
 
 
 def _deliveries(state):
     callbacks_needing_update = []
-    for callback_and_connectivity in state.callbacks_and_connectivities:
-        callback, callback_connectivity, = callback_and_connectivity
+    callbacks_and_connectivities = state.callbacks_and_connectivities
+    for callback, callback_connectivity in callbacks_and_connectivities.items():
         if callback_connectivity is not state.connectivity:
             callbacks_needing_update.append(callback)
-            callback_and_connectivity[1] = state.connectivity
+            # Replacing the value of an existing key is safe while iterating.
+            callbacks_and_connectivities[callback] = state.connectivity
     return callbacks_needing_update
 
 
@@ -1364,18 +1709,44 @@ def _deliver(state, initial_connectivity, initial_callbacks):
                 return
 
 
+def _delivery_worker(state, delivery_queue):
+    while True:
+        if not _FORK_SUPPORT_ENABLED:
+            # Without fork support there is nothing to check between jobs.
+            delivery = delivery_queue.get()
+        else:
+            try:
+                delivery = delivery_queue.get(
+                    timeout=_DELIVERY_WORKER_POLL_PERIOD_S)
+            except queue.Empty:
+                cygrpc.block_if_fork_in_progress(state)
+                continue
+        if delivery is None:
+            return
+        _deliver(state, *delivery)
+
+
 def _spawn_delivery(state, callbacks):
-    delivering_thread = cygrpc.ForkManagedThread(target=_deliver,
-                                                 args=(
-                                                     state,
-                                                     state.connectivity,
-                                                     callbacks,
-                                                 ))
-    delivering_thread.setDaemon(True)
-    delivering_thread.start()
+    if state.delivery_queue is None:
+        state.delivery_queue = queue.SimpleQueue()
+        delivering_thread = cygrpc.ForkManagedThread(
+            target=_delivery_worker, args=(state, state.delivery_queue))
+        delivering_thread.setDaemon(True)
+        delivering_thread.start()
+    state.delivery_queue.put((state.connectivity, callbacks))
     state.delivering = True
 
 
+def _stop_delivery(state):
+    """Lets the delivery worker exit once it has drained its queue.
+
+    Must be called with state.lock held.
+    """
+    if state.delivery_queue is not None:
+        state.delivery_queue.put(None)
+        state.delivery_queue = None
+
+
 # NOTE(https://github.com/grpc/grpc/issues/3064): We'd rather not poll.
 def _poll_connectivity(state, channel, initial_try_to_connect):
     try_to_connect = initial_try_to_connect
@@ -1384,27 +1755,27 @@ def _poll_connectivity(state, channel, initial_try_to_connect):
         state.connectivity = (
             _common.
             CYGRPC_CONNECTIVITY_STATE_TO_CHANNEL_CONNECTIVITY[connectivity])
-        callbacks = tuple(
-            callback for callback, unused_but_known_to_be_none_connectivity in
-            state.callbacks_and_connectivities)
-        for callback_and_connectivity in state.callbacks_and_connectivities:
-            callback_and_connectivity[1] = state.connectivity
+        callbacks = tuple(state.callbacks_and_connectivities)
+        for callback in callbacks:
+            state.callbacks_and_connectivities[callback] = state.connectivity
         if callbacks:
             _spawn_delivery(state, callbacks)
     while True:
         event = channel.watch_connectivity_state(connectivity,
                                                  time.time() + 0.2)
         cygrpc.block_if_fork_in_progress(state)
+        # Checking the connectivity state does not block, so it is done in the
+        # same critical section as the shutdown check.
         with state.lock:
             if not state.callbacks_and_connectivities and not state.try_to_connect:
                 state.polling = False
                 state.connectivity = None
+                _stop_delivery(state)
                 break
             try_to_connect = state.try_to_connect
             state.try_to_connect = False
-        if event.success or try_to_connect:
-            connectivity = channel.check_connectivity_state(try_to_connect)
-            with state.lock:
+            if event.success or try_to_connect:
+                connectivity = channel.check_connectivity_state(try_to_connect)
                 state.connectivity = (
                     _common.CYGRPC_CONNECTIVITY_STATE_TO_CHANNEL_CONNECTIVITY[
                         connectivity])
@@ -1423,44 +1794,131 @@ def _subscribe(state, callback, try_to_connect):
             polling_thread.setDaemon(True)
             polling_thread.start()
             state.polling = True
-            state.callbacks_and_connectivities.append([callback, None])
+            state.callbacks_and_connectivities[callback] = None
+            return
         elif not state.delivering and state.connectivity is not None:
-            _spawn_delivery(state, (callback,))
+            # The new callback is delivered to on this thread rather than on a
+            # freshly spawned one. Marking the state as delivering keeps the
+            # polling thread from delivering to it out of order meanwhile.
+            state.delivering = True
+            connectivity = state.connectivity
             state.try_to_connect |= bool(try_to_connect)
-            state.callbacks_and_connectivities.append(
-                [callback, state.connectivity])
+            state.callbacks_and_connectivities[callback] = connectivity
         else:
             state.try_to_connect |= bool(try_to_connect)
-            state.callbacks_and_connectivities.append([callback, None])
+            state.callbacks_and_connectivities[callback] = None
+            return
+    try:
+        callback(connectivity)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception(_CHANNEL_SUBSCRIPTION_CALLBACK_ERROR_LOG_MESSAGE)
+    with state.lock:
+        callbacks = _deliveries(state)
+        if callbacks:
+            _spawn_delivery(state, callbacks)
+        else:
+            state.delivering = False
 
 
 def _unsubscribe(state, callback):
     with state.lock:
-        for index, (subscribed_callback, unused_connectivity) in enumerate(
-                state.callbacks_and_connectivities):
-            if callback == subscribed_callback:
-                state.callbacks_and_connectivities.pop(index)
-                break
+        state.callbacks_and_connectivities.pop(callback, None)
 
 
-def _augment_options(base_options, compression):
-    compression_option = _compression.create_channel_option(compression)
-    return tuple(base_options) + compression_option + ((
-        cygrpc.ChannelArgKey.primary_user_agent_string,
-        _USER_AGENT,
-    ),)
+_PYTHON_CHANNEL_OPTIONS = (
+    grpc.experimental.ChannelOptions.SingleThreadedUnaryStream,
+    grpc.experimental.ChannelOptions.ChannelPoolSize,
+)
+
+
+def _separate_and_augment_channel_options(options, compression):
+    """Separates core channel options from Python channel options.
 
+    Args:
+      options: The options the channel was created with.
+      compression: An optional value indicating the compression method to be
+        used over the lifetime of the channel.
 
-def _separate_channel_options(options):
-    """Separates core channel options from Python channel options."""
+    Returns:
+      A list of the Python channel options and a tuple of the core channel
+      options, the latter augmented with the compression and user agent
+      options.
+    """
     core_options = []
     python_options = []
     for pair in options:
-        if pair[0] == grpc.experimental.ChannelOptions.SingleThreadedUnaryStream:
+        if pair[0] in _PYTHON_CHANNEL_OPTIONS:
             python_options.append(pair)
         else:
             core_options.append(pair)
-    return python_options, core_options
+    core_options.extend(_compression.create_channel_option(compression))
+    core_options.append((
+        cygrpc.ChannelArgKey.primary_user_agent_string,
+        _USER_AGENT,
+    ))
+    return python_options, tuple(core_options)
+
+
+def _batch_layers(calls):
+    """Partitions batch calls into layers of mutually independent calls.
+
+    Args:
+      calls: A sequence of (method, request, input_from) tuples.
+
+    Returns:
+      A list of lists of indices into calls. Every call in a layer depends only
+      on calls in earlier layers.
+
+    Raises:
+      ValueError: If input_from refers to a missing call or the dependencies
+        form a cycle.
+    """
+    remaining = {}
+    for index, (_, _, input_from) in enumerate(calls):
+        dependencies = frozenset(input_from or ())
+        for dependency in dependencies:
+            if not 0 <= dependency < len(calls):
+                raise ValueError(
+                    f'Batch call {index} depends on unknown call {dependency}!')
+        remaining[index] = dependencies
+    completed = set()
+    layers = []
+    while remaining:
+        layer = [
+            index for index, dependencies in remaining.items()
+            if dependencies <= completed
+        ]
+        if not layer:
+            raise ValueError('Batch call dependencies form a cycle!')
+        for index in layer:
+            del remaining[index]
+        completed.update(layer)
+        layers.append(layer)
+    return layers
+
+
+# Stubs create one multicallable per method, often many times over the life of
+# a channel, so the encoded form of each method name is memoized. The bound
+# keeps memory in check should an application use unboundedly many names.
+@functools.lru_cache(maxsize=1024)
+def _cached_encoded_method(method):
+    return _common.encode(method)
+
+
+# The most recently encoded method name and its encoding. Stubs are often
+# created in bulk for one method, whose name is then the same string object
+# each time. The pair is replaced as a whole, so readers need no lock.
+_LAST_ENCODED_METHOD = (None, None)
+
+
+def _encoded_method(method):
+    global _LAST_ENCODED_METHOD  # pylint: disable=global-statement
+    last_method, last_encoded_method = _LAST_ENCODED_METHOD
+    if method is last_method:
+        return last_encoded_method
+    encoded_method = _cached_encoded_method(method)
+    _LAST_ENCODED_METHOD = (method, encoded_method)
+    return encoded_method
 
 
 class Channel(grpc.Channel):
@@ -1476,14 +1934,26 @@ class Channel(grpc.Channel):
           compression: An optional value indicating the compression method to be
             used over the lifetime of the channel.
         """
-        python_options, core_options = _separate_channel_options(options)
+        python_options, core_options = _separate_and_augment_channel_options(
+            options, compression)
         self._single_threaded_unary_stream = _DEFAULT_SINGLE_THREADED_UNARY_STREAM
+        self._channel_pool_size = _DEFAULT_CHANNEL_POOL_SIZE
         self._process_python_options(python_options)
-        self._channel = cygrpc.Channel(
-            _common.encode(target), _augment_options(core_options, compression),
-            credentials)
-        self._call_state = _ChannelCallState(self._channel)
-        self._connectivity_state = _ChannelConnectivityState(self._channel)
+        if self._channel_pool_size > 1:
+            self._channel = _ChannelPool(_common.encode(target), core_options,
+                                         credentials, self._channel_pool_size)
+            self._call_state = None
+            self._managed_call = self._channel.managed_call
+            # Connectivity is reported for the first channel of the pool.
+            self._connectivity_state = _ChannelConnectivityState(
+                self._channel.channels[0])
+        else:
+            self._channel = cygrpc.Channel(_common.encode(target), core_options,
+                                           credentials)
+            self._call_state = _ChannelCallState(self._channel)
+            self._managed_call = _channel_managed_call_management(
+                self._call_state)
+            self._connectivity_state = _ChannelConnectivityState(self._channel)
         cygrpc.fork_register_channel(self)
         if cygrpc.g_gevent_activated:
             cygrpc.gevent_increment_channel_count()
@@ -1493,6 +1963,8 @@ class Channel(grpc.Channel):
         for pair in python_options:
             if pair[0] == grpc.experimental.ChannelOptions.SingleThreadedUnaryStream:
                 self._single_threaded_unary_stream = True
+            elif pair[0] == grpc.experimental.ChannelOptions.ChannelPoolSize:
+                self._channel_pool_size = int(pair[1])
 
     def subscribe(self, callback, try_to_connect=None):
         _subscribe(self._connectivity_state, callback, try_to_connect)
@@ -1504,9 +1976,10 @@ class Channel(grpc.Channel):
                     method,
                     request_serializer=None,
                     response_deserializer=None):
-        return _UnaryUnaryMultiCallable(
-            self._channel, _channel_managed_call_management(self._call_state),
-            _common.encode(method), request_serializer, response_deserializer)
+        return _UnaryUnaryMultiCallable(self._channel, self._managed_call,
+                                        _encoded_method(method),
+                                        request_serializer,
+                                        response_deserializer)
 
     def unary_stream(self,
                      method,
@@ -1518,36 +1991,128 @@ class Channel(grpc.Channel):
         # remains the default.
         if self._single_threaded_unary_stream:
             return _SingleThreadedUnaryStreamMultiCallable(
-                self._channel, _common.encode(method), request_serializer,
+                self._channel, _encoded_method(method), request_serializer,
                 response_deserializer)
         else:
-            return _UnaryStreamMultiCallable(
-                self._channel,
-                _channel_managed_call_management(self._call_state),
-                _common.encode(method), request_serializer,
-                response_deserializer)
+            return _UnaryStreamMultiCallable(self._channel, self._managed_call,
+                                             _encoded_method(method),
+                                             request_serializer,
+                                             response_deserializer)
 
     def stream_unary(self,
                      method,
                      request_serializer=None,
                      response_deserializer=None):
-        return _StreamUnaryMultiCallable(
-            self._channel, _channel_managed_call_management(self._call_state),
-            _common.encode(method), request_serializer, response_deserializer)
+        return _StreamUnaryMultiCallable(self._channel, self._managed_call,
+                                         _encoded_method(method),
+                                         request_serializer,
+                                         response_deserializer)
 
     def stream_stream(self,
                       method,
                       request_serializer=None,
                       response_deserializer=None):
-        return _StreamStreamMultiCallable(
-            self._channel, _channel_managed_call_management(self._call_state),
-            _common.encode(method), request_serializer, response_deserializer)
+        return _StreamStreamMultiCallable(self._channel, self._managed_call,
+                                          _encoded_method(method),
+                                          request_serializer,
+                                          response_deserializer)
+
+    def batch(self,
+              calls,
+              timeout=None,
+              metadata=None,
+              credentials=None,
+              wait_for_ready=None,
+              compression=None):
+        """Invokes a graph of dependent unary-unary RPCs.
+
+        This is an EXPERIMENTAL method.
+
+        The calls are partitioned into layers of mutually independent calls.
+        The calls of a layer are in flight concurrently and a layer is started
+        once every call it depends on has completed, so the latency of the
+        batch is bounded by the depth of the dependency graph rather than by
+        the number of calls. Should a request callable raise, or a call fail to
+        start, the calls already started in its layer are cancelled and the
+        exception is propagated.
+
+        Args:
+          calls: A sequence of (method, request, input_from) tuples. method is
+            either a method name, in which case requests and responses are
+            passed through as bytes, or a grpc.UnaryUnaryMultiCallable created
+            on this channel. input_from is a possibly-empty sequence of indices
+            into calls naming the calls whose responses this call depends on.
+            When input_from is non-empty, request must be a callable accepting
+            those responses positionally and returning the request message.
+          timeout: An optional duration of time in seconds to allow for the
+            whole batch.
+          metadata: Optional metadata sent with every call of the batch.
+          credentials: An optional CallCredentials for every call of the batch.
+          wait_for_ready: This is an EXPERIMENTAL argument. An optional flag to
+            enable wait_for_ready mechanism.
+          compression: An element of grpc.compression, e.g.
+            grpc.compression.Gzip. This is an EXPERIMENTAL option.
+
+        Returns:
+          A list holding the response of each call, in the order of calls.
 
-    def _unsubscribe_all(self):
+        Raises:
+          RpcError: Indicating that the first failed call of the batch
+            terminated with non-OK status. Calls that depend on it are not
+            started and the other calls of its layer are cancelled.
+          ValueError: If the dependencies of the calls are malformed.
+        """
+        layers = _batch_layers(calls)
+        # Only the remaining budget is handed to each call, so a monotonic
+        # clock suffices here; absolute call deadlines are wall-clock.
+        end = None if timeout is None else time.monotonic() + timeout
+        responses = [None] * len(calls)
+        for layer in layers:
+            call_futures = []
+            try:
+                for index in layer:
+                    call_futures.append(
+                        self._start_batch_call(calls[index], responses, end,
+                                               metadata, credentials,
+                                               wait_for_ready, compression))
+                for index, future in zip(layer, call_futures):
+                    responses[index] = future.result()
+            except Exception:  # pylint: disable=broad-except
+                for future in call_futures:
+                    future.cancel()
+                raise
+        return responses
+
+    def _start_batch_call(self, call, responses, end, metadata, credentials,
+                          wait_for_ready, compression):
+        method, request, input_from = call
+        if isinstance(method, grpc.UnaryUnaryMultiCallable):
+            multi_callable = method
+        else:
+            multi_callable = self.unary_unary(method)
+        if input_from:
+            request = request(
+                *(responses[dependency] for dependency in input_from))
+        timeout = None if end is None else end - time.monotonic()
+        return multi_callable.future(request,
+                                     timeout=timeout,
+                                     metadata=metadata,
+                                     credentials=credentials,
+                                     wait_for_ready=wait_for_ready,
+                                     compression=compression)
+
+    def _unsubscribe_all(self, timeout=-1):
         state = self._connectivity_state
-        if state:
-            with state.lock:
-                del state.callbacks_and_connectivities[:]
+        if state and state.lock.acquire(timeout=timeout):
+            try:
+                subscriptions = state.callbacks_and_connectivities
+                state.callbacks_and_connectivities = {}
+                _stop_delivery(state)
+            finally:
+                state.lock.release()
+            # The callbacks are released outside of the lock, since releasing
+            # them may run arbitrary finalizers.
+            del subscriptions
 
     def _close(self):
         self._unsubscribe_all()
@@ -1582,7 +2147,9 @@ class Channel(grpc.Channel):
         # then deletion of this grpc._channel.Channel instance can be made to
         # effect closure of the underlying cygrpc.Channel instance.
         try:
-            self._unsubscribe_all()
+            # During interpreter shutdown the lock may be held by a thread that
+            # will never release it, so do not wait on it indefinitely.
+            self._unsubscribe_all(timeout=_DEL_UNSUBSCRIBE_TIMEOUT_S)
         except:  # pylint: disable=bare-except
             # Exceptions in __del__ are ignored by Python anyway, but they can
             # keep spamming logs.  Just silence them.
@@ -1607,7 +2174,9 @@ class ThreadingMixIn(threading.Thread):
         :param kwargs:
         :return:
         """
-        self._worker_thread = threading.Thread(target=self.thread_run, args=args, kwargs=kwargs)
+        self._worker_thread = threading.Thread(target=self.thread_run,
+                                               args=args,
+                                               kwargs=kwargs)
         self._worker_thread.daemon = True
         self._worker_thread.start()
 
@@ -1623,110 +2192,587 @@ class ThreadingMixIn(threading.Thread):
     def thread_run(self):
         """
 
+        Implementations should wait on self._event rather than sleep between
+        iterations and return once it is set, so that thread_stop does not
+        wait out the join timeout.
         :return:
         """
 
 
+# How long successful and failed resolutions are served from the cache.
+_DNS_POSITIVE_TTL_S = 300
+_DNS_NEGATIVE_TTL_S = 60
+# How many resolutions are cached before the least recently used is evicted.
+_DNS_CACHE_MAX_SIZE = 1024
+
+
+def _ip_set_changed(old_ip_set, new_ip_set):
+    """
+    _ip_set_changed
+
+    Resolutions served from the cache are the very same frozenset, and
+    frozensets cache their hash, so this is O(1) unless the addresses changed
+    or a hash collides.
+    :param old_ip_set:
+    :param new_ip_set:
+    :return:
+    """
+    return new_ip_set is not old_ip_set and (
+        hash(new_ip_set) != hash(old_ip_set) or new_ip_set != old_ip_set)
+
+
 class DNSResolver:
     """
     DNSResolver
+
+    Resolutions are cached per (host, port), failures for a shorter time than
+    successes. An expired entry is still returned while it is refreshed in
+    the background, and concurrent lookups of the same key share one query.
+    Lookups run on daemon threads, so that one hung in getaddrinfo does not
+    hold up interpreter exit.
     """
 
+    _lock = threading.Lock()
+    # Maps (host, port) to (expiry, flag, ip_set), least recently used first.
+    _cache = collections.OrderedDict()
+    # Maps (host, port) to the future of its in-flight lookup.
+    _pending = {}
+
+    @classmethod
+    def _lookup(cls, host, port):
+        """
+        _lookup
+        :param host:
+        :param port:
+        :return: flag, ip_set, ttl
+        """
+        try:
+            # SOCK_STREAM keeps getaddrinfo from returning every address once
+            # per socket type, and AI_ADDRCONFIG from returning addresses of
+            # families this host has no address of its own in.
+            addresses = socket.getaddrinfo(host, port, socket.AF_UNSPEC,
+                                           socket.SOCK_STREAM, 0,
+                                           socket.AI_ADDRCONFIG)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.warning("DNS resolving of %s:%s failed",
+                            host,
+                            port,
+                            exc_info=True)
+            return False, frozenset(), _DNS_NEGATIVE_TTL_S
+        ip_set = frozenset(item[4][0] for item in addresses)
+        return True, ip_set, _DNS_POSITIVE_TTL_S
+
     @classmethod
-    def resolve(cls, host, port):
+    def _refresh(cls, key, future):
+        """
+        _refresh
+        :param key:
+        :param future: completed with flag, ip_set
+        :return:
+        """
+        flag, ip_set, ttl = cls._lookup(*key)
+        with cls._lock:
+            cls._cache[key] = (time.monotonic() + ttl, flag, ip_set)
+            cls._cache.move_to_end(key)
+            if len(cls._cache) > _DNS_CACHE_MAX_SIZE:
+                cls._cache.popitem(last=False)
+            cls._pending.pop(key, None)
+        future.set_result((flag, ip_set))
+
+    @classmethod
+    def _submit_refresh(cls, key):
+        """
+        Must be called with cls._lock held.
+        :param key:
+        :return:
+        """
+        future = cls._pending.get(key)
+        if future is None:
+            future = futures.Future()
+            cls._pending[key] = future
+            thread = threading.Thread(target=cls._refresh, args=(key, future))
+            thread.daemon = True
+            thread.start()
+        return future
+
+    @classmethod
+    def resolve(cls, host, port, force_refresh=False):
         """
         resolve
         :param host:
         :param port:
+        :param force_refresh: whether to bypass the cache and wait for a fresh
+            resolution, e.g. when polling for changes
         :return:
         """
-        ip_set = set()
-        flag = False
-        try:
-            ip_set = {item[4][0] for item in gai(host, port)}
-            flag = True
-        except Exception as err:
-            print(err)
-            print("DNS resolving  failed")
-        return flag, ip_set
+        key = (host, port)
+        with cls._lock:
+            entry = None if force_refresh else cls._cache.get(key)
+            if entry is None:
+                future = cls._submit_refresh(key)
+            else:
+                cls._cache.move_to_end(key)
+                expiry, flag, ip_set = entry
+                if expiry <= time.monotonic():
+                    cls._submit_refresh(key)
+                return flag, ip_set
+        return future.result()
+
+    @classmethod
+    def reset_after_fork(cls):
+        """
+        Resets a forked child, which inherits the lookups in flight and
+        possibly a held lock, but none of the threads running them.
+        :return:
+        """
+        cls._lock = threading.Lock()
+        cls._pending.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=DNSResolver.reset_after_fork)
+
+# Keeps the connections of pooled channels alive while RPCs are in flight.
+# The keepalive time matches the minimum ping interval gRPC servers permit by
+# default; pinging more often makes them close the connection.
+DEFAULT_CHANNEL_OPTIONS = (
+    ('grpc.keepalive_time_ms', 300000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.http2.max_pings_without_data', 0),
+)
+
+# Closes the channels of flushed and refreshed pools. It is created when a
+# pool is first replaced, and again in a forked child, which inherits the
+# executor but none of its worker threads.
+_CLOSE_POOL_LOCK = threading.Lock()
+_CLOSE_POOL = None
+_CLOSE_POOL_PID = None
+
+
+def _close_pool():
+    global _CLOSE_POOL, _CLOSE_POOL_PID  # pylint: disable=global-statement
+    with _CLOSE_POOL_LOCK:
+        if _CLOSE_POOL is None or _CLOSE_POOL_PID != os.getpid():
+            _CLOSE_POOL = futures.ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix='grpc-chan-close')
+            _CLOSE_POOL_PID = os.getpid()
+            atexit.register(_CLOSE_POOL.shutdown)
+        return _CLOSE_POOL
 
 
 class ChannelPool:
     """
     ChannelPool
-    """
 
-    def __init__(self, host, port, channel_num=1, await_time=20):
+    Channels are created by channel_factory, a callable with the signature of
+    init_channel minus self, or by a subclass's init_channel. One of them is
+    required, as the pool cannot choose the channels' credentials. For
+    example, a factory of secure channels:
+
+        def channel_factory(host, port, index, options):
+            return grpc.secure_channel('%s:%s' % (host, port), credentials,
+                                       options=options)
+    """
+    __slots__ = ('host', 'port', 'channel_num', 'await_time', 'pool',
+                 'channel_factory', 'options', '_counter')
+
+    def __init__(self,
+                 host,
+                 port,
+                 channel_num=1,
+                 await_time=20,
+                 channel_factory=None,
+                 options=DEFAULT_CHANNEL_OPTIONS):
+        if (channel_factory is None and
+                type(self).init_channel is ChannelPool.init_channel):
+            raise ValueError(
+                'ChannelPool requires a channel_factory or an init_channel '
+                'override!')
         self.host = host
         self.port = port
         self.channel_num = channel_num
         self.await_time = await_time
-        self.pool = []
+        self.channel_factory = channel_factory
+        self.options = tuple(options)
+        # The pool is replaced rather than mutated, so readers need no lock.
+        self.pool = ()
+        # next() on an itertools.count is atomic under the GIL.
+        self._counter = itertools.count()
         self.init_channel_pool()
 
-    @abstractmethod
-    def init_channel(self, host, port):
+    def init_channel(self, host, port, index, options):
         """
         init_channel
+
+        Implementations should create their channel with the given options.
+        Channels created with identical arguments may share one connection, so
+        the options of every channel carry its index as 'grpc.channel_id'.
         :param host:
         :param port:
+        :param index: the position of the channel in the pool
+        :param options: the pool's options plus the channel's id
         :return:
         """
+        raise NotImplementedError()
+
+    def channel_options(self, index):
+        """
+        channel_options
+        :param index:
+        :return:
+        """
+        return self.options + (('grpc.channel_id', index),)
 
     def init_channel_pool(self):
         """
         init_channel_pool
+
+        init_channel may block, e.g. until its channel is ready, so channels
+        are created concurrently when there is more than one.
         :return:
         """
-        self.pool = [self.init_channel(self.host, self.port) for _ in range(self.channel_num)]
+        factory = self.channel_factory
+        if factory is None:
+            factory = self.init_channel
+
+        def create_channel(index):
+            return factory(self.host, self.port, index,
+                           self.channel_options(index))
+
+        if self.channel_num > 1:
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.channel_num) as executor:
+                self.pool = tuple(
+                    executor.map(create_channel, range(self.channel_num)))
+        else:
+            self.pool = tuple(
+                create_channel(index) for index in range(self.channel_num))
+
+    def next_channel(self):
+        """
+        next_channel
+
+        Callers should pick channels through this method rather than by
+        indexing pool, so that their RPCs are spread round-robin over it.
+        :return:
+        :raises ValueError: if the pool is empty, e.g. after it was flushed
+        """
+        pool = self.pool
+        if not pool:
+            raise ValueError('The channel pool for {}:{} is empty!'.format(
+                self.host, self.port))
+        return pool[next(self._counter) % len(pool)]
+
+    @staticmethod
+    def _close_channels(channel_pool: List[Channel]):
+        """
+        Closes the channels on the shared closing executor without waiting.
+        :param channel_pool:
+        :return:
+        """
+        close_pool = _close_pool()
+        for channel in channel_pool:
+            close_pool.submit(channel.close)
 
     def flush_channel_pool(self):
         """
         flush_channel_pool
         :return:
         """
+        tmp_pool = self.pool
+        self.pool = ()
+        self._close_channels(tmp_pool)
 
-        def await_close(channel_pool: List[Channel]):
-            """
+    def refresh_channel_pool(self):
+        """
+        refresh_channel_pool
 
-            :param channel_pool:
-            :return:
-            """
-            for channel in channel_pool:
-                channel.close()
+        The new pool is built before it replaces the old one, so callers never
+        see an empty pool. The old channels are closed in the background.
+        :return:
+        """
+        _LOGGER.debug("Refreshing the channel pool for %s:%s", self.host,
+                      self.port)
+        tmp_pool = self.pool
+        self.init_channel_pool()
+        self._close_channels(tmp_pool)
 
-        tmp_pool = self.pool.copy()
-        self.pool = []
-        tmp_thread = threading.Thread(target=await_close, args=(tmp_pool,))
-        tmp_thread.start()
-        tmp_thread.join(self.await_time)
 
-    def refresh_channel_pool(self):
+class _ManagerScheduler:
+    """
+    Runs the polling rounds of all ChannelManagers on one daemon thread,
+    which exists only while rounds are scheduled.
+    """
+    __slots__ = ('_lock', '_wakeup', '_scheduler', '_thread', '_pid')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = Event()
+        self._scheduler = sched.scheduler(time.monotonic, self._delay)
+        self._thread = None
+        # The process the thread was started in.
+        self._pid = None
+
+    def _delay(self, timeout):
+        # Woken early when a round is scheduled, so that the scheduler
+        # reconsiders which round is due first.
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def _run(self):
+        while True:
+            self._scheduler.run()
+            with self._lock:
+                if self._scheduler.empty():
+                    self._thread = None
+                    return
+
+    def _start(self):
+        # Must be called with self._lock held.
+        self._wakeup = Event()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def enter(self, delay, action):
+        """
+        enter
+        :param delay:
+        :param action:
+        :return: the scheduled event
         """
+        with self._lock:
+            event = self._scheduler.enter(delay, 0, action)
+            if self._thread is None or self._pid != os.getpid():
+                # A forked child inherits the scheduled rounds, but not the
+                # thread running them.
+                self._start()
+            else:
+                self._wakeup.set()
+        return event
 
+    def cancel(self, event):
+        """
+        cancel
+        :param event:
         :return:
         """
-        print("refresh")
-        self.flush_channel_pool()
-        self.init_channel_pool()
+        try:
+            self._scheduler.cancel(event)
+        except ValueError:
+            # The event has already run.
+            pass
+
+    def reset_after_fork(self):
+        """
+        Resets a forked child, which inherits the scheduled rounds and possibly
+        held locks, but not the thread running the rounds. The inherited rounds
+        are dropped, for their owners to schedule again.
+        :return:
+        """
+        self._lock = threading.Lock()
+        self._wakeup = Event()
+        self._scheduler = sched.scheduler(time.monotonic, self._delay)
+        self._thread = None
+
+
+_MANAGER_SCHEDULER = _ManagerScheduler()
+
+_DNS_REGISTRY_MAX_WORKERS = 4
+
+
+class _DNSEndpoint:
+    """
+    The polling state of one (host, port) of the DNSRegistry.
+    """
+    __slots__ = ('ip_set', 'callbacks_and_intervals', 'scheduled_event',
+                 'poll_token')
+
+    def __init__(self, ip_set):
+        self.ip_set = ip_set
+        # Maps each subscribed callback to its polling interval.
+        self.callbacks_and_intervals = {}
+        self.scheduled_event = None
+        # Identifies the current poll, so that superseded polls end.
+        self.poll_token = None
+
+
+class DNSRegistry:
+    """
+    DNSRegistry
+
+    Polls the resolution of each (host, port) once for all of its subscribers
+    and calls them with the new addresses when the addresses change. Polls
+    run on an executor rather than on the shared scheduler thread, so that a
+    slow lookup or subscriber holds up only its own endpoint.
+    """
+
+    _lock = threading.Lock()
+    # Maps (host, port) to its _DNSEndpoint.
+    _endpoints = {}
+    _executor = None
+
+    @classmethod
+    def _schedule_poll(cls, key, endpoint, delay):
+        """
+        Schedules the next poll of the endpoint, superseding any other.
+        Must be called with cls._lock held.
+        :param key:
+        :param endpoint:
+        :param delay:
+        :return:
+        """
+        if endpoint.scheduled_event is not None:
+            _MANAGER_SCHEDULER.cancel(endpoint.scheduled_event)
+        token = object()
+        endpoint.poll_token = token
+        endpoint.scheduled_event = _MANAGER_SCHEDULER.enter(
+            delay, functools.partial(cls._submit_poll, key, token))
+
+    @classmethod
+    def _submit_poll(cls, key, token):
+        """
+        _submit_poll
+        :param key:
+        :param token:
+        :return:
+        """
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = futures.ThreadPoolExecutor(
+                    max_workers=_DNS_REGISTRY_MAX_WORKERS)
+            cls._executor.submit(cls._poll, key, token)
+
+    @classmethod
+    def _poll(cls, key, token):
+        """
+        _poll
+        :param key:
+        :param token:
+        :return:
+        """
+        with cls._lock:
+            endpoint = cls._endpoints.get(key)
+            if endpoint is None or endpoint.poll_token is not token:
+                return
+        flag, ip_set = DNSResolver.resolve(*key, force_refresh=True)
+        with cls._lock:
+            if (cls._endpoints.get(key) is not endpoint or
+                    endpoint.poll_token is not token):
+                return
+            changed = flag and _ip_set_changed(endpoint.ip_set, ip_set)
+            if changed:
+                endpoint.ip_set = ip_set
+            callbacks = tuple(endpoint.callbacks_and_intervals)
+            time_interval = min(endpoint.callbacks_and_intervals.values())
+            cls._schedule_poll(key, endpoint, time_interval)
+        _LOGGER.debug("Resolved addresses of %s:%s changed: %s", key[0], key[1],
+                      changed)
+        if changed:
+            for callback in callbacks:
+                try:
+                    callback(ip_set)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Exception calling DNS change callback for %s:%s",
+                        key[0], key[1])
+
+    @classmethod
+    def subscribe(cls, host, port, callback, time_interval):
+        """
+        subscribe
+        :param host:
+        :param port:
+        :param callback: called with the new set of addresses
+        :param time_interval: the polling period
+        :return: the current set of addresses
+        """
+        key = (host, port)
+        _, ip_set = DNSResolver.resolve(host, port)
+        with cls._lock:
+            endpoint = cls._endpoints.get(key)
+            if endpoint is None:
+                endpoint = _DNSEndpoint(ip_set)
+                cls._endpoints[key] = endpoint
+                cls._schedule_poll(key, endpoint, time_interval)
+            elif time_interval < min(endpoint.callbacks_and_intervals.values()):
+                # Polls sooner for the new subscriber.
+                cls._schedule_poll(key, endpoint, time_interval)
+            endpoint.callbacks_and_intervals[callback] = time_interval
+            return endpoint.ip_set
+
+    @classmethod
+    def unsubscribe(cls, host, port, callback):
+        """
+        unsubscribe
+        :param host:
+        :param port:
+        :param callback:
+        :return:
+        """
+        key = (host, port)
+        with cls._lock:
+            endpoint = cls._endpoints.get(key)
+            if endpoint is None:
+                return
+            endpoint.callbacks_and_intervals.pop(callback, None)
+            if not endpoint.callbacks_and_intervals:
+                del cls._endpoints[key]
+                _MANAGER_SCHEDULER.cancel(endpoint.scheduled_event)
+
+    @classmethod
+    def reset_after_fork(cls):
+        """
+        Resets a forked child, which inherits the executor, the polls in flight
+        and possibly held locks, but none of the threads running them. The
+        shared scheduler is reset too, and the polls of every endpoint are
+        scheduled again.
+        :return:
+        """
+        cls._lock = threading.Lock()
+        cls._executor = None
+        _MANAGER_SCHEDULER.reset_after_fork()
+        with cls._lock:
+            for key, endpoint in cls._endpoints.items():
+                endpoint.scheduled_event = None
+                cls._schedule_poll(
+                    key, endpoint,
+                    min(endpoint.callbacks_and_intervals.values()))
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=DNSRegistry.reset_after_fork)
 
 
 class ChannelManager(ThreadingMixIn):
     """
     ChannelManager
+
+    Managers of the same host and port share one DNSRegistry subscription,
+    whose polls are scheduled on a thread shared by all managers. Without a
+    channel_pool, the manager builds one with channel_factory, which is then
+    required.
     """
 
-    def __init__(self, host="", port="", channel_pool: ChannelPool = None, time_interval=120):
+    def __init__(self,
+                 host="",
+                 port="",
+                 channel_pool: ChannelPool = None,
+                 time_interval=120,
+                 channel_factory=None):
         super().__init__()
         if channel_pool is None and host and port:
-            self._channel_pool = ChannelPool(host, port)
+            self._channel_pool = ChannelPool(host,
+                                             port,
+                                             channel_factory=channel_factory)
         else:
             self._channel_pool = channel_pool
         self.host = self._channel_pool.host
         self.port = self._channel_pool.port
-        _, self._ip_set = DNSResolver.resolve(self.host, self.port)
         self.time_interval = time_interval
-        self.thread_start()
+        self._ip_set = DNSRegistry.subscribe(self.host, self.port,
+                                             self._on_ip_change, time_interval)
 
     @property
     def channel_pool(self):
@@ -1742,20 +2788,39 @@ class ChannelManager(ThreadingMixIn):
         :return:
         """
         flag = False
-        dns_flag, ip_set = DNSResolver.resolve(self.host, self.port)
-        if dns_flag and ip_set != self._ip_set:
+        dns_flag, ip_set = DNSResolver.resolve(self.host,
+                                               self.port,
+                                               force_refresh=True)
+        if dns_flag and _ip_set_changed(self._ip_set, ip_set):
             flag = True
             self._ip_set = ip_set
         return flag
 
+    def _on_ip_change(self, ip_set):
+        """
+
+        :param ip_set:
+        :return:
+        """
+        if not self._event.is_set():
+            self._ip_set = ip_set
+            self._channel_pool.refresh_channel_pool()
+
     def thread_run(self):
         """
+        Checks the resolution once, refreshing the pool if it changed.
+        :return:
+        """
+        flag = self.check_ip_set()
+        if flag:
+            self._channel_pool.refresh_channel_pool()
 
+    def thread_stop(self):
+        """
+        thread_stop
+
+        The registry holds on to the manager until it is stopped.
         :return:
         """
-        while True:
-            flag = self.check_ip_set()
-            print(flag)
-            if flag:
-                self._channel_pool.refresh_channel_pool()
-            time.sleep(self.time_interval)
+        self._event.set()
+        DNSRegistry.unsubscribe(self.host, self.port, self._on_ip_change)
@@ -140,9 +140,9 @@ def wait(wait_fn, wait_complete_fn, timeout=None, spin_cb=None):
         while not wait_complete_fn():
             _wait_once(wait_fn, MAXIMUM_WAIT_TIMEOUT, spin_cb)
     else:
-        end = time.time() + timeout
+        end = time.monotonic() + timeout
         while not wait_complete_fn():
-            remaining = min(end - time.time(), MAXIMUM_WAIT_TIMEOUT)
+            remaining = min(end - time.monotonic(), MAXIMUM_WAIT_TIMEOUT)
             if remaining < 0:
                 return True
             _wait_once(wait_fn, remaining, spin_cb)
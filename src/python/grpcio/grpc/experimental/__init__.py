@@ -34,8 +34,11 @@ class ChannelOptions(object):
 
      Attributes:
        SingleThreadedUnaryStream: Perform unary-stream RPCs on a single thread.
+       ChannelPoolSize: The number of underlying connections across which the
+         RPCs of a channel are spread. Defaults to 1.
     """
     SingleThreadedUnaryStream = "SingleThreadedUnaryStream"
+    ChannelPoolSize = "grpc.channel_pool_size"
 
 
 class UsageError(Exception):
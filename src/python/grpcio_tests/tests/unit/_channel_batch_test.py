@@ -0,0 +1,136 @@
+# Copyright 2022 The gRPC Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests batches of dependent unary-unary RPCs."""
+
+import logging
+import threading
+import unittest
+
+import grpc
+
+from tests.unit import test_common
+from tests.unit.framework.common import test_constants
+
+_ECHO = '/test/Echo'
+_DOUBLE = '/test/Double'
+_ABORT = '/test/Abort'
+_BLOCK = '/test/Block'
+
+
+class _RequestBuilderError(Exception):
+    pass
+
+
+class _GenericHandler(grpc.GenericRpcHandler):
+
+    def __init__(self):
+        self.block_terminated = threading.Event()
+
+    def _block(self, request, context):
+        context.add_callback(self.block_terminated.set)
+        self.block_terminated.wait()
+        return request
+
+    def service(self, handler_call_details):
+        if handler_call_details.method == _ECHO:
+            return grpc.unary_unary_rpc_method_handler(
+                lambda request, unused_context: request)
+        elif handler_call_details.method == _DOUBLE:
+            return grpc.unary_unary_rpc_method_handler(
+                lambda request, unused_context: request * 2)
+        elif handler_call_details.method == _ABORT:
+            return grpc.unary_unary_rpc_method_handler(
+                lambda request, context: context.abort(
+                    grpc.StatusCode.FAILED_PRECONDITION, 'Aborted!'))
+        elif handler_call_details.method == _BLOCK:
+            return grpc.unary_unary_rpc_method_handler(self._block)
+        else:
+            return None
+
+
+class ChannelBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = test_common.test_server()
+        self._handler = _GenericHandler()
+        self._server.add_generic_rpc_handlers((self._handler,))
+        port = self._server.add_insecure_port('[::]:0')
+        self._server.start()
+        self._channel = grpc.insecure_channel('localhost:%d' % port)
+
+    def tearDown(self):
+        self._channel.close()
+        self._server.stop(None)
+
+    def test_independent_calls(self):
+        responses = self._channel.batch(
+            ((_ECHO, b'a', ()), (_DOUBLE, b'b', ())),
+            timeout=test_constants.LONG_TIMEOUT)
+        self.assertEqual([b'a', b'bb'], responses)
+
+    def test_dependent_calls(self):
+        calls = (
+            (_ECHO, b'a', ()),
+            (_DOUBLE, lambda first: first + b'b', (0,)),
+            (_ECHO, lambda first, second: first + second, (0, 1)),
+        )
+        responses = self._channel.batch(calls,
+                                        timeout=test_constants.LONG_TIMEOUT)
+        self.assertEqual([b'a', b'abab', b'aabab'], responses)
+
+    def test_multi_callable(self):
+        multi_callable = self._channel.unary_unary(
+            _DOUBLE,
+            request_serializer=lambda request: request.encode('ascii'),
+            response_deserializer=lambda response: response.decode('ascii'))
+        responses = self._channel.batch(((multi_callable, 'x', ()),),
+                                        timeout=test_constants.LONG_TIMEOUT)
+        self.assertEqual(['xx'], responses)
+
+    def test_failed_call(self):
+        with self.assertRaises(grpc.RpcError) as exception_context:
+            self._channel.batch(
+                ((_ABORT, b'a', ()), (_ECHO, lambda unused: b'b', (0,))),
+                timeout=test_constants.LONG_TIMEOUT)
+        self.assertIs(grpc.StatusCode.FAILED_PRECONDITION,
+                      exception_context.exception.code())
+
+    def test_failed_request_builder_cancels_its_layer(self):
+
+        def fail(unused_first):
+            raise _RequestBuilderError()
+
+        calls = (
+            (_ECHO, b'a', ()),
+            (_BLOCK, lambda first: first, (0,)),
+            (_ECHO, fail, (0,)),
+        )
+        with self.assertRaises(_RequestBuilderError):
+            self._channel.batch(calls, timeout=test_constants.LONG_TIMEOUT)
+        self.assertTrue(
+            self._handler.block_terminated.wait(test_constants.SHORT_TIMEOUT))
+
+    def test_cyclic_dependencies(self):
+        with self.assertRaises(ValueError):
+            self._channel.batch(((_ECHO, lambda unused: b'a', (1,)),
+                                 (_ECHO, lambda unused: b'b', (0,))))
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            self._channel.batch(((_ECHO, lambda unused: b'a', (3,)),))
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(verbosity=2)
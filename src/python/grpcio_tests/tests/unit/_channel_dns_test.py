@@ -0,0 +1,429 @@
+# Copyright 2022 The gRPC Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the DNS resolution helpers of grpc._channel."""
+
+import logging
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+import unittest
+
+from grpc import _channel
+
+from tests.unit.framework.common import test_constants
+
+_HOST = 'dns.test'
+_OTHER_HOST = 'other.dns.test'
+_THIRD_HOST = 'third.dns.test'
+_PORT = 443
+_KEY = (_HOST, _PORT)
+_TIME_INTERVAL = 0.05
+
+
+class _GetAddrInfo(object):
+    """A stand-in for socket.getaddrinfo returning configurable addresses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Maps each host to its addresses, or None if it fails to resolve.
+        self.addresses = {
+            _HOST: ('10.0.0.1',),
+            _OTHER_HOST: ('10.0.1.1',),
+            _THIRD_HOST: ('10.0.2.1',),
+        }
+        self.calls = 0
+        self.thread = None
+        self.called = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, host, port, *unused_args):
+        with self._lock:
+            self.calls += 1
+            self.thread = threading.current_thread()
+            addresses = self.addresses[host]
+        self.called.set()
+        self.release.wait()
+        if addresses is None:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name not known')
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))
+                for address in addresses]
+
+
+class _Channel(object):
+
+    def __init__(self, host, port, index, options):
+        self.host = host
+        self.port = port
+        self.index = index
+        self.options = options
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+def _wait_for(predicate):
+    deadline = time.monotonic() + test_constants.SHORT_TIMEOUT
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('Condition not met in time!')
+        time.sleep(0.01)
+
+
+def _run_in_forked_child(predicate):
+    """Returns the exit status of a child exiting with 0 iff predicate holds."""
+    pid = os.fork()
+    if pid == 0:
+        # Kills the child should predicate hang.
+        signal.alarm(test_constants.SHORT_TIMEOUT)
+        try:
+            os._exit(0 if predicate() else 1)
+        except BaseException:  # pylint: disable=broad-except
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+    return status
+
+
+class _StubbedGetAddrInfoTest(object):
+
+    def setUp(self):
+        self._getaddrinfo = _GetAddrInfo()
+        self._original_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = self._getaddrinfo
+        _channel.DNSResolver._cache.clear()
+
+    def tearDown(self):
+        self._getaddrinfo.release.set()
+        _wait_for(lambda: not _channel.DNSResolver._pending)
+        socket.getaddrinfo = self._original_getaddrinfo
+        _channel.DNSResolver._cache.clear()
+
+
+class DNSResolverCacheTest(_StubbedGetAddrInfoTest, unittest.TestCase):
+
+    def _expire(self):
+        _, flag, ip_set = _channel.DNSResolver._cache[_KEY]
+        _channel.DNSResolver._cache[_KEY] = (time.monotonic() - 1, flag, ip_set)
+
+    def test_positive_result_is_cached(self):
+        first = _channel.DNSResolver.resolve(_HOST, _PORT)
+        second = _channel.DNSResolver.resolve(_HOST, _PORT)
+
+        self.assertEqual((True, frozenset(('10.0.0.1',))), first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, self._getaddrinfo.calls)
+
+    def test_negative_result_is_cached(self):
+        self._getaddrinfo.addresses[_HOST] = None
+
+        first = _channel.DNSResolver.resolve(_HOST, _PORT)
+        second = _channel.DNSResolver.resolve(_HOST, _PORT)
+
+        self.assertEqual((False, frozenset()), first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, self._getaddrinfo.calls)
+
+    def test_stale_result_is_served_while_revalidating(self):
+        _channel.DNSResolver.resolve(_HOST, _PORT)
+        self._expire()
+        self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+        stale = _channel.DNSResolver.resolve(_HOST, _PORT)
+
+        self.assertEqual((True, frozenset(('10.0.0.1',))), stale)
+        _wait_for(lambda: _channel.DNSResolver.resolve(_HOST, _PORT) ==
+                  (True, frozenset(('10.0.0.2',))))
+        self.assertEqual(2, self._getaddrinfo.calls)
+
+    def test_forced_refresh_bypasses_cache(self):
+        _channel.DNSResolver.resolve(_HOST, _PORT)
+        self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+        fresh = _channel.DNSResolver.resolve(_HOST, _PORT, force_refresh=True)
+
+        self.assertEqual((True, frozenset(('10.0.0.2',))), fresh)
+        self.assertEqual(2, self._getaddrinfo.calls)
+
+    def test_least_recently_used_result_is_evicted(self):
+        original_max_size = _channel._DNS_CACHE_MAX_SIZE
+        _channel._DNS_CACHE_MAX_SIZE = 2
+        try:
+            _channel.DNSResolver.resolve(_HOST, _PORT)
+            _channel.DNSResolver.resolve(_OTHER_HOST, _PORT)
+            _channel.DNSResolver.resolve(_HOST, _PORT)
+            _channel.DNSResolver.resolve(_THIRD_HOST, _PORT)
+        finally:
+            _channel._DNS_CACHE_MAX_SIZE = original_max_size
+
+        self.assertEqual([_KEY, (_THIRD_HOST, _PORT)],
+                         list(_channel.DNSResolver._cache))
+
+    def test_lookups_run_on_daemon_threads(self):
+        _channel.DNSResolver.resolve(_HOST, _PORT)
+
+        self.assertTrue(self._getaddrinfo.thread.daemon)
+
+    def test_concurrent_lookups_are_coalesced(self):
+        self._getaddrinfo.release.clear()
+        results = []
+
+        def resolve():
+            results.append(_channel.DNSResolver.resolve(_HOST, _PORT))
+
+        threads = [threading.Thread(target=resolve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self._getaddrinfo.called.wait(test_constants.SHORT_TIMEOUT)
+        # Give every thread the chance to join the lookup in flight.
+        time.sleep(0.1)
+        self._getaddrinfo.release.set()
+        for thread in threads:
+            thread.join(test_constants.SHORT_TIMEOUT)
+
+        self.assertEqual([(True, frozenset(('10.0.0.1',)))] * 4, results)
+        self.assertEqual(1, self._getaddrinfo.calls)
+
+
+class ManagerSchedulerTest(unittest.TestCase):
+
+    def test_rounds_run_in_deadline_order(self):
+        scheduler = _channel._ManagerScheduler()
+        rounds = queue.Queue()
+
+        scheduler.enter(0.2, lambda: rounds.put('late'))
+        scheduler.enter(0.05, lambda: rounds.put('early'))
+
+        self.assertEqual('early',
+                         rounds.get(timeout=test_constants.SHORT_TIMEOUT))
+        self.assertEqual('late',
+                         rounds.get(timeout=test_constants.SHORT_TIMEOUT))
+
+    def test_cancelled_round_does_not_run(self):
+        scheduler = _channel._ManagerScheduler()
+        rounds = queue.Queue()
+
+        cancelled = scheduler.enter(0.05, lambda: rounds.put('cancelled'))
+        scheduler.enter(0.1, lambda: rounds.put('kept'))
+        scheduler.cancel(cancelled)
+
+        self.assertEqual('kept',
+                         rounds.get(timeout=test_constants.SHORT_TIMEOUT))
+        self.assertTrue(rounds.empty())
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork')
+    def test_rounds_run_after_fork(self):
+        scheduler = _channel._ManagerScheduler()
+        started = threading.Event()
+        scheduler.enter(0, started.set)
+        # Keeps the scheduler's thread alive across the fork.
+        pending = scheduler.enter(test_constants.LONG_TIMEOUT, lambda: None)
+        started.wait(test_constants.SHORT_TIMEOUT)
+
+        def run_round():
+            ran = threading.Event()
+            scheduler.enter(0, ran.set)
+            return ran.wait(test_constants.SHORT_TIMEOUT / 2)
+
+        status = _run_in_forked_child(run_round)
+        scheduler.cancel(pending)
+
+        self.assertEqual(0, status)
+
+
+class DNSRegistryTest(_StubbedGetAddrInfoTest, unittest.TestCase):
+
+    def test_subscribers_are_notified_of_changes(self):
+        first, second = queue.Queue(), queue.Queue()
+        ip_set = _channel.DNSRegistry.subscribe(_HOST, _PORT, first.put,
+                                                _TIME_INTERVAL)
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, second.put, _TIME_INTERVAL)
+        try:
+            self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+            self.assertEqual(frozenset(('10.0.0.1',)), ip_set)
+            self.assertEqual(frozenset(('10.0.0.2',)),
+                             first.get(timeout=test_constants.SHORT_TIMEOUT))
+            self.assertEqual(frozenset(('10.0.0.2',)),
+                             second.get(timeout=test_constants.SHORT_TIMEOUT))
+        finally:
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, first.put)
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, second.put)
+
+    def test_shorter_interval_is_polled_sooner(self):
+        slow, fast = queue.Queue(), queue.Queue()
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, slow.put,
+                                       test_constants.LONG_TIMEOUT)
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, fast.put, _TIME_INTERVAL)
+        try:
+            self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+            self.assertEqual(frozenset(('10.0.0.2',)),
+                             fast.get(timeout=test_constants.SHORT_TIMEOUT))
+        finally:
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, slow.put)
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, fast.put)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork')
+    def test_subscribers_are_notified_after_fork(self):
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, id, _TIME_INTERVAL)
+        try:
+            # Waits for a poll, which creates the registry's executor.
+            _wait_for(lambda: self._getaddrinfo.calls >= 2)
+
+            def notified():
+                changes = queue.Queue()
+                _channel.DNSRegistry.subscribe(_HOST, _PORT, changes.put,
+                                               _TIME_INTERVAL)
+                self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+                return changes.get(timeout=test_constants.SHORT_TIMEOUT /
+                                   2) == frozenset(('10.0.0.2',))
+
+            # As if another thread were polling at the time of the fork.
+            with _channel.DNSRegistry._lock:
+                status = _run_in_forked_child(notified)
+        finally:
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, id)
+
+        self.assertEqual(0, status)
+
+    def test_unchanged_addresses_are_not_notified(self):
+        changes = queue.Queue()
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, changes.put,
+                                       _TIME_INTERVAL)
+        try:
+            _wait_for(lambda: self._getaddrinfo.calls >= 3)
+
+            self.assertTrue(changes.empty())
+        finally:
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, changes.put)
+
+    def test_unsubscribed_callback_is_not_notified(self):
+        unsubscribed, subscribed = queue.Queue(), queue.Queue()
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, unsubscribed.put,
+                                       _TIME_INTERVAL)
+        _channel.DNSRegistry.subscribe(_HOST, _PORT, subscribed.put,
+                                       _TIME_INTERVAL)
+        _channel.DNSRegistry.unsubscribe(_HOST, _PORT, unsubscribed.put)
+        try:
+            self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+            subscribed.get(timeout=test_constants.SHORT_TIMEOUT)
+            self.assertTrue(unsubscribed.empty())
+        finally:
+            _channel.DNSRegistry.unsubscribe(_HOST, _PORT, subscribed.put)
+        self.assertNotIn(_KEY, _channel.DNSRegistry._endpoints)
+
+
+class ChannelManagerTest(_StubbedGetAddrInfoTest, unittest.TestCase):
+
+    def test_channel_pool_is_round_robin(self):
+        pool = _channel.ChannelPool(_HOST,
+                                    _PORT,
+                                    channel_num=3,
+                                    channel_factory=_Channel)
+
+        self.assertEqual([0, 1, 2, 0],
+                         [pool.next_channel().index for _ in range(4)])
+        for index, channel in enumerate(pool.pool):
+            self.assertIn(('grpc.channel_id', index), channel.options)
+
+    def test_flushed_channel_pool_is_empty(self):
+        pool = _channel.ChannelPool(_HOST, _PORT, channel_factory=_Channel)
+        channel = pool.next_channel()
+
+        pool.flush_channel_pool()
+
+        self.assertTrue(channel.closed.wait(test_constants.SHORT_TIMEOUT))
+        with self.assertRaises(ValueError):
+            pool.next_channel()
+
+    def test_channel_factory_is_required(self):
+        with self.assertRaises(ValueError):
+            _channel.ChannelManager(_HOST, _PORT)
+
+    def test_pool_is_refreshed_on_change(self):
+        manager = _channel.ChannelManager(_HOST,
+                                          _PORT,
+                                          time_interval=_TIME_INTERVAL,
+                                          channel_factory=_Channel)
+        old_pool = manager.channel_pool
+        try:
+            self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+
+            _wait_for(lambda: manager.channel_pool is not old_pool)
+            for channel in old_pool:
+                self.assertTrue(
+                    channel.closed.wait(test_constants.SHORT_TIMEOUT))
+        finally:
+            manager.thread_stop()
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork')
+    def test_close_pool_is_recreated_after_fork(self):
+        close_pool = _channel._close_pool()
+
+        status = _run_in_forked_child(
+            lambda: _channel._close_pool() is not close_pool)
+
+        self.assertEqual(0, status)
+        self.assertIs(close_pool, _channel._close_pool())
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'Requires os.fork')
+    def test_resolver_resolves_after_fork(self):
+        _channel.DNSResolver.resolve(_HOST, _PORT)
+
+        # As if another thread were resolving at the time of the fork.
+        with _channel.DNSResolver._lock:
+            status = _run_in_forked_child(lambda: _channel.DNSResolver.resolve(
+                _OTHER_HOST, _PORT) == (True, frozenset(('10.0.1.1',))))
+
+        self.assertEqual(0, status)
+
+    def test_slow_refresh_does_not_stall_other_managers(self):
+        blocked = threading.Event()
+        created = []
+
+        def blocking_channel_factory(host, port, index, options):
+            created.append(index)
+            if len(created) > 1:
+                blocked.wait()
+            return _Channel(host, port, index, options)
+
+        slow = _channel.ChannelManager(_HOST,
+                                       _PORT,
+                                       time_interval=_TIME_INTERVAL,
+                                       channel_factory=blocking_channel_factory)
+        fast = _channel.ChannelManager(_OTHER_HOST,
+                                       _PORT,
+                                       time_interval=_TIME_INTERVAL,
+                                       channel_factory=_Channel)
+        old_pool = fast.channel_pool
+        try:
+            self._getaddrinfo.addresses[_HOST] = ('10.0.0.2',)
+            _wait_for(lambda: len(created) > 1)
+            self._getaddrinfo.addresses[_OTHER_HOST] = ('10.0.1.2',)
+
+            _wait_for(lambda: fast.channel_pool is not old_pool)
+        finally:
+            blocked.set()
+            slow.thread_stop()
+            fast.thread_stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+# Copyright 2022 The gRPC Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests channels that spread their RPCs over several connections."""
+
+import logging
+import os
+import unittest
+
+import grpc
+from grpc import _channel
+
+from tests.unit import test_common
+from tests.unit.framework.common import test_constants
+
+_POOL_SIZE = 3
+
+_UNARY_UNARY = '/test/UnaryUnary'
+_UNARY_STREAM = '/test/UnaryStream'
+_STREAM_STREAM = '/test/StreamStream'
+
+_POOL_SIZE_VARIABLE = 'GRPC_PYTHON_CHANNEL_POOL_SIZE'
+
+
+class _GenericHandler(grpc.GenericRpcHandler):
+
+    def service(self, handler_call_details):
+        if handler_call_details.method == _UNARY_UNARY:
+            return grpc.unary_unary_rpc_method_handler(
+                lambda request, unused_context: request)
+        elif handler_call_details.method == _UNARY_STREAM:
+            return grpc.unary_stream_rpc_method_handler(
+                lambda request, unused_context: iter((request, request)))
+        elif handler_call_details.method == _STREAM_STREAM:
+            return grpc.stream_stream_rpc_method_handler(
+                lambda request_iterator, unused_context: request_iterator)
+        else:
+            return None
+
+
+class ChannelPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = test_common.test_server()
+        self._server.add_generic_rpc_handlers((_GenericHandler(),))
+        port = self._server.add_insecure_port('[::]:0')
+        self._server.start()
+        self._channel = grpc.insecure_channel(
+            'localhost:%d' % port,
+            options=((grpc.experimental.ChannelOptions.ChannelPoolSize,
+                      _POOL_SIZE),))
+
+    def tearDown(self):
+        self._channel.close()
+        self._server.stop(None)
+
+    def test_unary_unary(self):
+        multi_callable = self._channel.unary_unary(_UNARY_UNARY)
+        futures = [
+            multi_callable.future(bytes((index,)),
+                                  timeout=test_constants.LONG_TIMEOUT)
+            for index in range(2 * _POOL_SIZE)
+        ]
+        for index, future in enumerate(futures):
+            self.assertEqual(bytes((index,)), future.result())
+
+    def test_unary_stream(self):
+        multi_callable = self._channel.unary_stream(_UNARY_STREAM)
+        for index in range(2 * _POOL_SIZE):
+            responses = multi_callable(bytes((index,)),
+                                       timeout=test_constants.LONG_TIMEOUT)
+            self.assertEqual([bytes((index,))] * 2, list(responses))
+
+    def test_stream_stream(self):
+        multi_callable = self._channel.stream_stream(_STREAM_STREAM)
+        requests = [bytes((index,)) for index in range(2 * _POOL_SIZE)]
+        for _ in range(_POOL_SIZE):
+            responses = multi_callable(iter(requests),
+                                       timeout=test_constants.LONG_TIMEOUT)
+            self.assertEqual(requests, list(responses))
+
+    def test_connectivity(self):
+        grpc.channel_ready_future(
+            self._channel).result(timeout=test_constants.LONG_TIMEOUT)
+
+
+class ChannelPoolSizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self._original_pool_size = os.environ.get(_POOL_SIZE_VARIABLE)
+
+    def tearDown(self):
+        if self._original_pool_size is None:
+            os.environ.pop(_POOL_SIZE_VARIABLE, None)
+        else:
+            os.environ[_POOL_SIZE_VARIABLE] = self._original_pool_size
+
+    def test_pool_size_from_environment(self):
+        os.environ[_POOL_SIZE_VARIABLE] = str(_POOL_SIZE)
+
+        self.assertEqual(_POOL_SIZE, _channel._default_channel_pool_size())
+
+    def test_malformed_pool_size_falls_back_to_one(self):
+        os.environ[_POOL_SIZE_VARIABLE] = 'many'
+
+        self.assertEqual(1, _channel._default_channel_pool_size())
+
+    def test_empty_pool_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _channel._ChannelPool(b'localhost:0', (), None, 0)
+
+
+if __name__ == '__main__':
+    logging.basicConfig()
+    unittest.main(verbosity=2)
@@ -17,6 +17,7 @@ from concurrent import futures
 import itertools
 import logging
 import threading
+import time
 import unittest
 
 import grpc
@@ -35,6 +36,31 @@ from tests.unit._rpc_test_helpers import unary_stream_multi_callable
 from tests.unit._rpc_test_helpers import unary_unary_multi_callable
 from tests.unit.framework.common import test_constants
 
+_STALLED_SEND_COUNT = 50
+# The polling timeout of grpc._common.wait.
+_STALLED_SEND_TIMEOUT = 0.1
+
+
+class _BadLengthHintIterator(object):
+    """Iterates over requests while failing to report how many remain."""
+
+    def __init__(self, requests, length_hint):
+        self._iterator = iter(requests)
+        self._length_hint = length_hint
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def __length_hint__(self):
+        return self._length_hint()
+
+
+def _raise_length_hint_error():
+    raise RuntimeError('Length hint failed!')
+
 
 class RPCPart2Test(BaseRPCTest, unittest.TestCase):
 
@@ -143,6 +169,36 @@ class RPCPart2Test(BaseRPCTest, unittest.TestCase):
         self.assertEqual(expected_response, response)
         self.assertIs(grpc.StatusCode.OK, call.code())
 
+    def testStreamRequestBlockingUnaryResponseDoesNotStallBetweenSends(self):
+        # Every send must wake the request consumer as soon as it completes;
+        # were it to wait out the polling timeout instead, these RPCs would
+        # take at least _STALLED_SEND_TIMEOUT per request.
+        requests = tuple(b'\x07\x08' for _ in range(_STALLED_SEND_COUNT))
+        multi_callable = stream_unary_multi_callable(self._channel)
+
+        start = time.monotonic()
+        multi_callable(iter(requests))
+        _, call = multi_callable.with_call(iter(requests))
+        elapsed = time.monotonic() - start
+
+        self.assertIs(grpc.StatusCode.OK, call.code())
+        self.assertLess(elapsed, _STALLED_SEND_COUNT * _STALLED_SEND_TIMEOUT)
+
+    def testStreamRequestWithBadLengthHint(self):
+        requests = tuple(
+            b'\x07\x08' for _ in range(test_constants.STREAM_LENGTH))
+        expected_response = self._handler.handle_stream_unary(
+            iter(requests), None)
+        multi_callable = stream_unary_multi_callable(self._channel)
+
+        for length_hint in (_raise_length_hint_error, lambda: -2):
+            response, call = multi_callable.with_call(
+                _BadLengthHintIterator(requests, length_hint),
+                timeout=test_constants.SHORT_TIMEOUT)
+
+            self.assertEqual(expected_response, response)
+            self.assertIs(grpc.StatusCode.OK, call.code())
+
     def testSuccessfulStreamRequestFutureUnaryResponse(self):
         requests = tuple(
             b'\x07\x08' for _ in range(test_constants.STREAM_LENGTH))